@@ -1,3 +1,6 @@
 from .processor import BatchImageProcessor, BatchResult
+from .pipeline import PipelineConfig
+from .manifest import ProcessingManifest
+from .sinks import ShardConfig
 
-__all__ = ["BatchImageProcessor", "BatchResult"]
+__all__ = ["BatchImageProcessor", "BatchResult", "PipelineConfig", "ProcessingManifest", "ShardConfig"]
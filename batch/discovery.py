@@ -0,0 +1,78 @@
+"""
+Streaming input discovery for batch runs.
+
+Directories are walked with os.scandir and files are yielded as they are
+seen, so slicing starts on the first image without listing the whole
+tree first. Paths are yielded relative to the input root with "/"
+separators; they double as manifest keys and output subtree names.
+"""
+
+import os
+from fnmatch import fnmatch
+from typing import Iterable, Iterator, Optional, Sequence
+
+
+def _matches(rel_path: str, patterns: Sequence[str]) -> bool:
+    """
+    Glob match: patterns containing "/" match the relative path,
+    others match the file or directory name alone.
+    """
+    name = rel_path.rsplit("/", 1)[-1]
+    return any(fnmatch(rel_path if "/" in p else name, p) for p in patterns)
+
+
+def iter_image_files(
+    root: str,
+    extensions: Iterable[str],
+    recursive: bool = False,
+    include: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None,
+    skip_dirs: Iterable[str] = ()
+) -> Iterator[str]:
+    """
+    Yield relative paths of image files under root, in scandir order.
+
+    include: if given, files must match one of these globs.
+    exclude: files and directories matching any of these are skipped
+    (excluded directories are not descended into).
+    skip_dirs: absolute directories never to enter, e.g. an output
+    directory that lives inside the input tree.
+    """
+    extensions = {e.lower() for e in extensions}
+    skip = {os.path.realpath(d) for d in skip_dirs}
+    pending = [""]
+
+    while pending:
+        rel_dir = pending.pop()
+        subdirs = []
+
+        with os.scandir(os.path.join(root, rel_dir) if rel_dir else root) as entries:
+            for entry in entries:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and not (exclude and _matches(rel_path, exclude)):
+                        if os.path.realpath(entry.path) not in skip:
+                            subdirs.append(rel_path)
+                    continue
+
+                if os.path.splitext(entry.name)[1].lower() not in extensions:
+                    continue
+                if include and not _matches(rel_path, include):
+                    continue
+                if exclude and _matches(rel_path, exclude):
+                    continue
+                if not entry.is_file():
+                    continue
+                yield rel_path
+
+        # Depth-first; reversed so subdirectories are visited in scandir order.
+        pending.extend(reversed(subdirs))
+
+
+def first_image_file(root: str, extensions: Iterable[str], **filters) -> Optional[str]:
+    """
+    Relative path of the first image found under root, or None.
+    Stops scanning at the first match.
+    """
+    return next(iter_image_files(root, extensions, **filters), None)
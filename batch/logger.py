@@ -1,23 +1,110 @@
+"""
+Batch logging: callers enqueue records, one background thread writes them.
+
+`setup_logger` gives the PixiForgeBatch logger a QueueHandler and starts a
+single QueueListener that owns the console, log-file and metrics-file
+handlers. Logging a line costs the caller a queue put; %-style arguments
+and the Formatter run on the listener thread, and records a level or
+quiet filter drops are never formatted at all.
+
+Worker processes must not write into the parent's queue (a forked child
+would inherit a queue nobody drains). They buffer per-file records for
+the parent to replay (see batch.processor) and `init_worker_logging`
+gives anything else a plain stderr handler.
+"""
+
+import atexit
 import logging
 import os
+import queue
+import sys
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+LOGGER = "PixiForgeBatch"
+METRICS_LOGGER = "PixiForgeBatch.metrics"
+
+# Pass as extra= on run-level lines (start, summary) that quiet mode keeps.
+SUMMARY = {"summary": True}
+
+_FORMAT = "[%(asctime)s] [%(levelname)s] %(message)s"
+_DATEFMT = "%Y-%m-%d %H:%M:%S"
+
+_queue: "Optional[queue.Queue]" = None
+_listener: Optional[QueueListener] = None
+
+
+class _LazyQueueHandler(QueueHandler):
+    """
+    QueueHandler for an in-process queue: the record is enqueued as-is
+    instead of being formatted (and pickle-proofed) on the calling thread.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _QuietFilter(logging.Filter):
+    """
+    In quiet mode pass only warnings, errors and SUMMARY-tagged lines.
+    """
+    def __init__(self):
+        super().__init__()
+        self.quiet = False
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not self.quiet or record.levelno >= logging.WARNING or getattr(record, "summary", False)
+
+
+class _MetricsOnly(logging.Filter):
+    def __init__(self, include: bool):
+        super().__init__()
+        self.include = include
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return (record.name == METRICS_LOGGER) == self.include
+
+
+_quiet_filter = _QuietFilter()
+
 
-def setup_logger(log_dir: str = None) -> logging.Logger: #type: ignore
-    logger = logging.getLogger("PixiForgeBatch")
+def get_metrics_logger() -> logging.Logger:
+    """
+    Logger for per-file timing records (one JSON object per line).
+    Writes nowhere unless setup_logger was given a log_dir.
+    """
+    logger = logging.getLogger(METRICS_LOGGER)
+    logger.propagate = False  # keep JSON out of the human-readable log
+    if not logger.handlers:
+        logger.addHandler(logging.NullHandler())
+    return logger
+
+
+def setup_logger(log_dir: str = None, quiet: bool = False) -> logging.Logger: #type: ignore
+    """
+    Configure (once per process) and return the batch logger.
+
+    quiet: summary-only output for bulk runs; per-file INFO lines are
+    dropped before they are queued. Applies on every call.
+    """
+    global _queue, _listener
+
+    logger = logging.getLogger(LOGGER)
     logger.setLevel(logging.INFO)
+    _quiet_filter.quiet = quiet
 
     if logger.handlers:
         return logger  # Prevent duplicate handlers
 
-    formatter = logging.Formatter(
-        "[%(asctime)s] [%(levelname)s] %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
+    formatter = logging.Formatter(_FORMAT, datefmt=_DATEFMT)
+    human_only = _MetricsOnly(include=False)
 
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    console_handler.addFilter(human_only)
+    handlers = [console_handler]
 
+    metrics_handler = None
     if log_dir:
         os.makedirs(log_dir, exist_ok=True)
         log_file = os.path.join(
@@ -27,6 +114,63 @@ def setup_logger(log_dir: str = None) -> logging.Logger: #type: ignore
 
         file_handler = logging.FileHandler(log_file, encoding="utf-8")
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        file_handler.addFilter(human_only)
+        handlers.append(file_handler)
+
+        # Stage timings go to a JSON-lines file next to the log file.
+        metrics_handler = logging.FileHandler(
+            os.path.splitext(log_file)[0] + ".metrics.jsonl", encoding="utf-8"
+        )
+        metrics_handler.setFormatter(logging.Formatter("%(message)s"))
+        metrics_handler.addFilter(_MetricsOnly(include=True))
+        handlers.append(metrics_handler)
+
+    _queue = queue.Queue()
+    _listener = QueueListener(_queue, *handlers)
+    _listener.start()
+    atexit.register(_stop_listener)
+
+    queue_handler = _LazyQueueHandler(_queue)
+    queue_handler.addFilter(_quiet_filter)
+    logger.addHandler(queue_handler)
+
+    if metrics_handler is not None:
+        metrics_logger = get_metrics_logger()
+        metrics_logger.setLevel(logging.INFO)
+        metrics_logger.addHandler(_LazyQueueHandler(_queue))
 
     return logger
+
+
+def flush_logs():
+    """
+    Block until the listener has written every record queued so far.
+    """
+    if _queue is not None and _listener is not None:
+        _queue.join()
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()  # drains the queue first
+        _listener = None
+
+
+def init_worker_logging():
+    """
+    Process-pool initializer: drop handlers inherited from the parent
+    (their queue is not drained in this process) and log to stderr.
+    """
+    global _queue, _listener
+    _queue = _listener = None
+
+    for name in (LOGGER, METRICS_LOGGER):
+        logger = logging.getLogger(name)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter(_FORMAT, datefmt=_DATEFMT))
+    logging.getLogger(LOGGER).addHandler(handler)
+    get_metrics_logger()
@@ -0,0 +1,121 @@
+"""
+Processing manifest for incremental, resumable batch runs.
+
+The manifest lives in the output directory as JSON lines, one entry per
+successfully sliced input: input path, size, mtime, content hash, the
+slicing parameters and the tiles written. Entries are appended and
+flushed as each file completes, so an interrupted run leaves a record of
+everything it finished and the next run resumes from there. Later lines
+win; `compact()` rewrites the file with one line per input.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+from smart.energy_cache import file_digest
+
+MANIFEST_NAME = ".pixiforge-manifest.jsonl"
+
+
+class ProcessingManifest:
+    """
+    Record of which inputs were sliced, with what parameters, into which files.
+
+    An input is up to date when its entry has the same parameters, all of
+    its outputs still exist and the file is unchanged: same size and
+    mtime, or (when only the mtime moved, e.g. after a copy) same hash.
+    """
+
+    def __init__(self, output_dir: str, name: str = MANIFEST_NAME):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, name)
+        self.entries: Dict[str, dict] = {}
+        self._stream = None
+        self._lock = threading.Lock()  # pipeline discovery runs on the reader thread
+        self._load()
+
+    def _load(self):
+        if not os.path.isfile(self.path):
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn last line from an interrupted run
+                if isinstance(entry, dict) and "input" in entry:
+                    self.entries[entry["input"]] = entry
+
+    def is_current(self, key: str, input_path: str, params: dict) -> bool:
+        """
+        True when input_path (manifest key `key`) needs no reprocessing.
+        """
+        entry = self.entries.get(key)
+        if entry is None or entry.get("params") != params:
+            return False
+
+        if not all(
+            os.path.isfile(os.path.join(self.output_dir, out))
+            for out in entry.get("outputs", [])
+        ):
+            return False
+
+        stat = os.stat(input_path)
+        if stat.st_size != entry.get("size"):
+            return False
+        if stat.st_mtime_ns == entry.get("mtime_ns"):
+            return True
+
+        # Touched or copied but maybe not edited: compare content.
+        if file_digest(input_path) != entry.get("hash"):
+            return False
+        self.record(key, input_path, params, entry["outputs"])
+        return True
+
+    def record(self, key: str, input_path: str, params: dict, outputs: List[str]):
+        """
+        Append (and flush) the entry for a successfully processed input.
+        """
+        stat = os.stat(input_path)
+        entry = {
+            "input": key,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": file_digest(input_path),
+            "params": params,
+            "outputs": outputs,
+        }
+        with self._lock:
+            self.entries[key] = entry
+
+            if self._stream is None:
+                os.makedirs(self.output_dir, exist_ok=True)
+                self._stream = open(self.path, "a", encoding="utf-8")
+            self._stream.write(json.dumps(entry, sort_keys=True) + "\n")
+            self._stream.flush()
+
+    def compact(self):
+        """
+        Rewrite the manifest with the latest entry per input (atomic replace).
+        """
+        self.close()
+        if not self.entries:
+            return
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for key in sorted(self.entries):
+                f.write(json.dumps(self.entries[key], sort_keys=True) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def close(self):
+        with self._lock:
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+
+    def get(self, key: str) -> Optional[dict]:
+        return self.entries.get(key)
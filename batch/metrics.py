@@ -0,0 +1,191 @@
+"""
+Per-stage timing for batch runs.
+
+Every file is timed in these stages:
+  - decode:   full-resolution pixel decode
+  - analysis: smart energy analysis and cut search (incl. reduced decodes)
+  - slicing:  cropping tiles (streaming band reads count here too)
+  - dedupe:   blank / duplicate tile checks (only when enabled)
+  - encode:   compressing each tile in memory
+  - write:    writing the encoded bytes to disk
+
+Timings are wall-clock seconds. In pipeline mode the writer threads run
+concurrently, so a file's encode/write times are sums across threads.
+"""
+
+import io
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from PIL import Image
+
+STAGES = ("decode", "analysis", "slicing", "dedupe", "encode", "write")
+PERCENTILES = (50, 90, 99)
+
+
+class StageTimer:
+    """
+    Accumulates seconds per stage for one file. Thread-safe; pass
+    `stages` (a plain dict) across process boundaries, not the timer.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def timed(self, iterable: Iterable, stage: str) -> Iterator:
+        """
+        Iterate, charging the time spent producing each item to `stage`
+        (e.g. lazy tile crops) but not the time the consumer spends on it.
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(stage, time.perf_counter() - start)
+                return
+            self.add(stage, time.perf_counter() - start)
+            yield item
+
+
+def encode_tile(image: Image.Image, path: str, timer: StageTimer, options: Optional[dict] = None) -> bytes:
+    """
+    Timed in-memory encode. The format comes from the file extension, as
+    with Image.save(path); options go to the encoder (see core.encoding).
+    """
+    ext = os.path.splitext(path)[1].lower()
+    fmt = Image.registered_extensions().get(ext)
+    if fmt is None:
+        raise ValueError(f"unknown file extension: {ext}")
+
+    buffer = io.BytesIO()
+    with timer.stage("encode"):
+        image.save(buffer, format=fmt, **(options or {}))
+    return buffer.getvalue()
+
+
+def save_tile(image: Image.Image, path: str, timer: StageTimer, options: Optional[dict] = None):
+    """
+    Image.save split into timed encode (to memory) and write (to disk) steps.
+    """
+    data = encode_tile(image, path, timer, options)
+    with timer.stage("write"):
+        with open(path, "wb") as f:
+            f.write(data)
+
+
+class FileTiming:
+    """
+    Timing record for one input file.
+    """
+
+    def __init__(self, file: str, ok: bool, seconds: float, stages: Dict[str, float]):
+        self.file = file
+        self.ok = ok
+        self.seconds = seconds  # wall time for the whole file
+        self.stages = stages
+
+    def to_dict(self) -> dict:
+        return {
+            "file": self.file,
+            "status": "ok" if self.ok else "failed",
+            "seconds": round(self.seconds, 6),
+            "stages": {k: round(v, 6) for k, v in self.stages.items()},
+        }
+
+    def __str__(self) -> str:
+        return json.dumps(self.to_dict())
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Linear-interpolated percentile (q in 0..100) of a non-empty list.
+    """
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def summarize(timings: List[FileTiming]) -> Dict[str, dict]:
+    """
+    Aggregate per-stage (and "total") statistics over file records:
+    count, sum, max and the PERCENTILES, in seconds.
+    """
+    columns: Dict[str, List[float]] = {}
+    for t in timings:
+        for stage, seconds in t.stages.items():
+            columns.setdefault(stage, []).append(seconds)
+        columns.setdefault("total", []).append(t.seconds)
+
+    summary = {}
+    for stage in STAGES + ("total",):
+        values = columns.get(stage)
+        if not values:
+            continue
+        stats = {"count": len(values), "sum": sum(values), "max": max(values)}
+        for q in PERCENTILES:
+            stats[f"p{q}"] = percentile(values, q)
+        summary[stage] = stats
+    return summary
+
+
+def write_prometheus_textfile(path: str, result, elapsed: Optional[float] = None):
+    """
+    Write a node_exporter textfile-collector summary of a BatchResult.
+    The file is replaced atomically so the collector never reads it half-written.
+    """
+    lines = [
+        "# HELP pixiforge_batch_files Input files by outcome in the last batch run.",
+        "# TYPE pixiforge_batch_files gauge",
+        f'pixiforge_batch_files{{status="processed"}} {len(result.processed)}',
+        f'pixiforge_batch_files{{status="failed"}} {len(result.failed)}',
+        f'pixiforge_batch_files{{status="skipped"}} {len(result.skipped)}',
+        "# HELP pixiforge_batch_stage_seconds Per-file wall time by stage in the last batch run.",
+        "# TYPE pixiforge_batch_stage_seconds summary",
+    ]
+    for stage, stats in result.stage_summary().items():
+        for q in PERCENTILES:
+            lines.append(
+                f'pixiforge_batch_stage_seconds{{stage="{stage}",quantile="{q / 100:g}"}} {stats[f"p{q}"]:.6f}'
+            )
+        lines.append(f'pixiforge_batch_stage_seconds_sum{{stage="{stage}"}} {stats["sum"]:.6f}')
+        lines.append(f'pixiforge_batch_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+
+    if elapsed is not None:
+        lines += [
+            "# HELP pixiforge_batch_duration_seconds Wall time of the last batch run.",
+            "# TYPE pixiforge_batch_duration_seconds gauge",
+            f"pixiforge_batch_duration_seconds {elapsed:.6f}",
+        ]
+    lines += [
+        "# HELP pixiforge_batch_last_run_timestamp_seconds Unix time the last batch run finished.",
+        "# TYPE pixiforge_batch_last_run_timestamp_seconds gauge",
+        f"pixiforge_batch_last_run_timestamp_seconds {time.time():.0f}",
+    ]
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
@@ -0,0 +1,251 @@
+"""
+Staged decode -> slice -> encode pipeline for batch runs.
+
+Three stages joined by bounded queues:
+  - reader:  one thread decoding input files (PIL decode releases the GIL)
+  - slicer:  one thread running smart-then-fallback slicing on decoded images
+  - writers: a thread pool encoding and saving tiles (Image.save releases the GIL)
+
+Encoding/writing of file N overlaps with decoding of file N+1, while the
+queue depths cap how many decoded images and pending tiles sit in memory.
+"""
+
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+from PIL import Image
+from core.decoded import DecodedImage
+from core.slicer import ImageSlicer
+from smart.energy_cache import shared_energy_cache
+from smart.smart_splitter import SmartSplitter
+from batch.metrics import StageTimer, save_tile
+from batch.tiles import TileFilter
+
+
+_STOP = object()
+
+
+class PipelineConfig:
+    """
+    Queue depths and writer pool size for a pipelined batch run.
+
+    decode_queue: decoded images allowed to wait for the slicing stage.
+    encode_queue: sliced tiles allowed to wait for a writer thread.
+    encode_workers: writer threads encoding and saving tiles.
+    """
+    def __init__(self, decode_queue: int = 4, encode_queue: int = 64, encode_workers: int = 4):
+        if decode_queue <= 0 or encode_queue <= 0 or encode_workers <= 0:
+            raise ValueError("Pipeline queue depths and encode_workers must be positive.")
+
+        self.decode_queue = decode_queue
+        self.encode_queue = encode_queue
+        self.encode_workers = encode_workers
+
+
+class _FileTicket:
+    """
+    Tracks one input file through the pipeline.
+
+    The slicing stage holds one reference until every tile is queued and
+    each queued tile holds another; `done` is set when all are released.
+    """
+    def __init__(self, filename: str, log, started: float = None):
+        self.filename = filename
+        self.log = log
+        self.timer = StageTimer()
+        self.started = time.perf_counter() if started is None else started
+        self.error: Optional[str] = None
+        self.success_msg: Optional[str] = None
+        self.done = threading.Event()
+        self._pending = 1
+        self._lock = threading.Lock()
+
+    def add(self):
+        with self._lock:
+            self._pending += 1
+
+    def release(self, error: Optional[Exception] = None):
+        with self._lock:
+            if error is not None and self.error is None:
+                self.error = f"{self.filename} | ERROR: {str(error)}"
+            self._pending -= 1
+            if self._pending == 0:
+                self.done.set()
+
+
+def run_pipeline(
+    jobs: Iterable[Tuple[str, str]],
+    params,
+    config: PipelineConfig,
+    logger,
+    log_factory,
+    sink=None
+) -> Iterator[Tuple[str, Optional[str], float, Dict[str, float]]]:
+    """
+    Run (input_path, image_output_dir) jobs through the staged pipeline.
+
+    Yields (filename, error, seconds, stages) in job order once each
+    file's tiles are on disk; error is None on success, seconds is the
+    file's wall time from decode start and stages its per-stage timings.
+    Per-file log lines are buffered by log_factory() objects and replayed
+    on logger in the same order.
+
+    sink: a batch.sinks shard sink the writers put tiles into instead of
+    writing one file per tile.
+    """
+    decode_q: "queue.Queue" = queue.Queue(maxsize=config.decode_queue)
+    encode_q: "queue.Queue" = queue.Queue(maxsize=config.encode_queue)
+    ticket_q: "queue.Queue" = queue.Queue(maxsize=config.decode_queue + config.encode_workers)
+    # Errors that ended a stage thread (not a single file), re-raised to the caller.
+    failures = []
+
+    def reader():
+        try:
+            for input_path, image_output_dir in jobs:
+                started = time.perf_counter()
+                try:
+                    image = Image.open(input_path)
+                    image.load()
+                    decode_q.put((input_path, image_output_dir, image, None, started))
+                except Exception as e:
+                    decode_q.put((input_path, image_output_dir, None, e, started))
+        except BaseException as e:
+            # e.g. discovery failing while jobs are iterated
+            failures.append(e)
+        finally:
+            decode_q.put(_STOP)
+
+    def slicer():
+        try:
+            while True:
+                item = decode_q.get()
+                if item is _STOP:
+                    break
+                ticket, tiles = _slice_stage(item, params, log_factory(), sink)
+                ticket_q.put(ticket)
+                try:
+                    # Tiles are cropped lazily as the encode queue makes room.
+                    for out_path, tile, box in tiles:
+                        ticket.add()
+                        encode_q.put((ticket, out_path, tile, box))
+                    ticket.release()
+                except Exception as e:
+                    ticket.release(e)
+        except BaseException as e:
+            failures.append(e)
+        finally:
+            for _ in range(config.encode_workers):
+                encode_q.put(_STOP)
+            ticket_q.put(_STOP)
+
+    def writer():
+        while True:
+            item = encode_q.get()
+            if item is _STOP:
+                break
+            ticket, out_path, image, box = item
+            try:
+                if sink is None:
+                    save_tile(image, out_path, ticket.timer, params.save_options)
+                else:
+                    sink.put(out_path, image, box, ticket.timer, params.save_options)
+                ticket.release()
+            except Exception as e:
+                ticket.release(e)
+
+    threads = [
+        threading.Thread(target=reader, name="pixiforge-reader", daemon=True),
+        threading.Thread(target=slicer, name="pixiforge-slicer", daemon=True),
+    ] + [
+        threading.Thread(target=writer, name=f"pixiforge-writer-{i}", daemon=True)
+        for i in range(config.encode_workers)
+    ]
+    for t in threads:
+        t.start()
+
+    while True:
+        ticket = ticket_q.get()
+        if ticket is _STOP:
+            break
+        ticket.done.wait()
+
+        for level, msg, args in ticket.log.records:
+            logger.log(level, msg, *args)
+        if ticket.error is None:
+            logger.info(ticket.success_msg, ticket.filename)
+        else:
+            logger.error(ticket.error)
+
+        yield ticket.filename, ticket.error, time.perf_counter() - ticket.started, ticket.timer.stages
+
+    for t in threads:
+        t.join()
+    if failures:
+        raise failures[0]
+
+
+def _slice_stage(item, params, log, sink=None) -> Tuple[_FileTicket, Iterator[Tuple[str, Image.Image, tuple]]]:
+    """
+    Slicing stage for one decoded file: smart first, then fallback.
+
+    Returns the file's ticket and a lazy iterator of (out_path, tile, box)
+    triples for the writers; the iterator is empty if the file failed.
+    """
+    input_path, image_output_dir, image, decode_error, started = item
+    filename = os.path.basename(input_path)
+    base_name = os.path.splitext(filename)[0]
+    ticket = _FileTicket(filename, log, started)
+    if decode_error is None:
+        ticket.timer.add("decode", time.perf_counter() - started)
+
+    def tiles(slices) -> Iterator[Tuple[str, Image.Image, tuple]]:
+        tile_filter = TileFilter(params.skip_blank, params.dedupe, ticket.timer) if params.filters_tiles else None
+
+        for s in ticket.timer.timed(slices, "slicing"):
+            name = f"{base_name}_part{s.index}.{params.output_format}"
+            if tile_filter is None or tile_filter.keep(name, s.image):
+                yield os.path.join(image_output_dir, name), s.image, s.box
+
+        if tile_filter is not None:
+            tile_filter.write_index(image_output_dir, base_name, filename, sink)
+
+    try:
+        if sink is None:
+            os.makedirs(image_output_dir, exist_ok=True)
+        log.info("Processing: %s", filename)
+        if decode_error is not None:
+            raise decode_error
+
+        # --- SMART PATH (content-aware cuts for any mode) ---
+        if params.smart:
+            try:
+                log.info("Attempting smart slicing")
+                with ticket.timer.stage("analysis"):
+                    splitter = SmartSplitter(
+                        decoded=DecodedImage.from_image(input_path, image),
+                        reduce=params.smart_reduce,
+                        energy_cache=shared_energy_cache(params.energy_cache_dir),
+                        energy=params.smart_energy
+                    )
+                    plan = splitter.plan(
+                        params.mode, n=params.n, rows=params.rows, cols=params.cols,
+                        **params.smart_search()
+                    )
+
+                ticket.success_msg = "Smart slicing succeeded: %s"
+                return ticket, tiles(ImageSlicer.from_image(image).iter_plan(plan))
+
+            except Exception as smart_error:
+                log.warning("Smart slicing failed, falling back: %s", smart_error)
+
+        # --- FALLBACK / NORMAL PATH ---
+        slices = ImageSlicer.from_image(image).iter_slices(**params.layout())
+
+        ticket.success_msg = "Completed: %s"
+        return ticket, tiles(slices)
+
+    except Exception as e:
+        ticket.error = f"{filename} | ERROR: {str(e)}"
+        return ticket, iter(())
@@ -1,17 +1,323 @@
+import json
+import logging
 import os
-from typing import List, Optional
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from core.decoded import DecodedImage
+from core.encoding import pil_save_options
+from core.plan import Size
 from core.slicer import ImageSlicer
-from smart.smart_splitter import SmartVerticalSplitter
-from batch.logger import setup_logger
+from core.streaming import StreamingImageSlicer
+from smart.energy_cache import shared_energy_cache
+from smart.smart_splitter import SmartSplitter
+from batch.discovery import iter_image_files
+from batch.logger import SUMMARY, flush_logs, get_metrics_logger, init_worker_logging, setup_logger
+from batch.manifest import ProcessingManifest
+from batch.metrics import FileTiming, StageTimer, save_tile, summarize
+from batch.pipeline import PipelineConfig, run_pipeline
+from batch.sinks import ShardConfig, open_sink
+from batch.tiles import TileFilter, tile_files, written_outputs
 
 
-SUPPORTED_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".tiff"}
+SUPPORTED_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".tiff", ".tif"}
 
 
 class BatchResult:
     def __init__(self):
         self.processed: List[str] = []
         self.failed: List[str] = []
+        self.skipped: List[str] = []  # unchanged since the manifest entry
+        self.timings: List[FileTiming] = []  # per-file stage timings, in file order
+        self.elapsed: float = 0.0  # wall seconds for the whole run
+
+    def stage_summary(self) -> Dict[str, dict]:
+        """
+        Per-stage count/sum/max/p50/p90/p99 seconds over processed files
+        (see batch.metrics.summarize).
+        """
+        return summarize(self.timings)
+
+
+class SliceParams:
+    """
+    Slicing parameters shared by every file of a batch run.
+    Kept as a small plain object so it can be pickled to worker processes.
+    """
+    def __init__(
+        self,
+        mode: str,
+        n: Optional[int] = None,
+        rows: Optional[int] = None,
+        cols: Optional[int] = None,
+        output_format: str = "png",
+        smart: bool = False,
+        streaming: bool = False,
+        smart_strategy: str = "greedy",
+        smart_reduce: int = 1,
+        smart_multiscale: bool = False,
+        smart_tolerance: Optional[int] = None,
+        energy_cache_dir: Optional[str] = None,
+        smart_energy: str = "canny",
+        encoder_profile: Optional[str] = None,
+        skip_blank: bool = False,
+        dedupe: bool = False,
+        tile: Optional[Size] = None,
+        stride: Optional[Size] = None,
+        padding: str = "shift"
+    ):
+        self.mode = mode
+        self.n = n
+        self.rows = rows
+        self.cols = cols
+        self.output_format = output_format
+        self.smart = smart
+        self.streaming = streaming
+        self.smart_strategy = smart_strategy
+        self.smart_reduce = smart_reduce
+        self.smart_multiscale = smart_multiscale
+        self.smart_tolerance = smart_tolerance
+        self.energy_cache_dir = energy_cache_dir
+        self.smart_energy = smart_energy
+        self.encoder_profile = encoder_profile
+        self.save_options = pil_save_options(output_format, encoder_profile)
+        self.skip_blank = skip_blank
+        self.dedupe = dedupe
+        self.tile = tile
+        self.stride = stride
+        self.padding = padding
+
+    def layout(self) -> dict:
+        """
+        Keyword arguments for ImageSlicer.iter_slices.
+        """
+        return {
+            "mode": self.mode,
+            "n": self.n,
+            "rows": self.rows,
+            "cols": self.cols,
+            "tile": self.tile,
+            "stride": self.stride,
+            "padding": self.padding,
+        }
+
+    def smart_search(self) -> dict:
+        """
+        Keyword arguments for SmartVerticalSplitter.find_split_positions.
+        In multiscale mode smart_reduce picks the coarse level (default 4).
+        """
+        search = {"strategy": self.smart_strategy}
+        if self.smart_multiscale:
+            search.update(
+                multiscale=True,
+                coarse=self.smart_reduce if self.smart_reduce > 1 else 4,
+                tolerance=self.smart_tolerance
+            )
+        return search
+
+    def fingerprint(self) -> dict:
+        """
+        Parameters that change the output tiles, as stored in the manifest.
+        Execution-only settings (streaming, cache dir) are left out.
+        Returned in JSON form ((w, h) tuples as lists) so it compares equal
+        to the copy read back from the manifest.
+        """
+        return json.loads(json.dumps({
+            "mode": self.mode,
+            "n": self.n,
+            "rows": self.rows,
+            "cols": self.cols,
+            "format": self.output_format,
+            "smart": self.smart,
+            "smart_strategy": self.smart_strategy,
+            "smart_reduce": self.smart_reduce,
+            "smart_multiscale": self.smart_multiscale,
+            "smart_tolerance": self.smart_tolerance,
+            "smart_energy": self.smart_energy,
+            "encoder_profile": self.encoder_profile,
+            "skip_blank": self.skip_blank,
+            "dedupe": self.dedupe,
+            "tile": self.tile,
+            "stride": self.stride,
+            "padding": self.padding,
+        }))
+
+    @property
+    def filters_tiles(self) -> bool:
+        return self.skip_blank or self.dedupe
+
+    def output_names(self, rel_base: str) -> List[str]:
+        """
+        Tile paths (relative to the output dir) written for one input,
+        given its relative path without extension ("sub/img").
+        Smart and deterministic slicing produce the same number of tiles.
+        Window mode tile counts depend on the image size (see tile_files).
+        """
+        count = self.rows * self.cols if self.mode == "grid" else self.n
+        base_name = rel_base.rsplit("/", 1)[-1]
+        return [
+            f"{rel_base}/{base_name}_part{i}.{self.output_format}"
+            for i in range(1, count + 1)
+        ]
+
+
+class _LogBuffer:
+    """
+    Collects log calls made inside a worker process so the parent can
+    replay them, in file order, on the real batch logger.
+    """
+    def __init__(self):
+        self.records: List[Tuple[int, str, tuple]] = []
+
+    # Arguments are kept unformatted; the parent's logger formats them lazily.
+    def info(self, msg: str, *args):
+        self.records.append((logging.INFO, msg, args))
+
+    def warning(self, msg: str, *args):
+        self.records.append((logging.WARNING, msg, args))
+
+    def error(self, msg: str, *args):
+        self.records.append((logging.ERROR, msg, args))
+
+
+def process_file(
+    input_path: str,
+    image_output_dir: str,
+    params: SliceParams,
+    log,
+    timer: Optional[StageTimer] = None,
+    sink=None,
+    decoded: Optional[DecodedImage] = None
+) -> Optional[str]:
+    """
+    Slice one image into image_output_dir (smart first, then fallback).
+
+    Returns None on success, or the error message recorded for the file.
+    Stage timings (see batch.metrics) are added to timer if given. With a
+    shard sink (batch.sinks) tiles go into its shards under their file names.
+    decoded: pixels already in memory (e.g. a video frame); input_path then
+    only names the tiles.
+    """
+    filename = os.path.basename(input_path)
+    base_name = os.path.splitext(filename)[0]
+    timer = timer or StageTimer()
+    if sink is None:
+        os.makedirs(image_output_dir, exist_ok=True)
+
+    def save_all(slices):
+        tile_filter = TileFilter(params.skip_blank, params.dedupe, timer) if params.filters_tiles else None
+
+        # Tiles are cropped lazily; each one is saved and dropped in turn.
+        for s in timer.timed(slices, "slicing"):
+            out_name = f"{base_name}_part{s.index}.{params.output_format}"
+            if tile_filter is not None and not tile_filter.keep(out_name, s.image):
+                continue
+            out_path = os.path.join(image_output_dir, out_name)
+            if sink is None:
+                save_tile(s.image, out_path, timer, params.save_options)
+            else:
+                sink.put(out_path, s.image, s.box, timer, params.save_options)
+
+        if tile_filter is not None:
+            tile_filter.write_index(image_output_dir, base_name, filename, sink)
+
+    try:
+        log.info("Processing: %s", filename)
+
+        # One decode shared by the smart attempt and the fallback.
+        decoded = decoded or DecodedImage(input_path)
+
+        # --- SMART PATH (content-aware cuts for any mode) ---
+        if params.smart:
+            try:
+                log.info("Attempting smart slicing")
+                if params.smart_reduce == 1:
+                    # Full-resolution analysis reads the decoded image anyway.
+                    with timer.stage("decode"):
+                        decoded.image
+                with timer.stage("analysis"):
+                    splitter = SmartSplitter(
+                        decoded=decoded,
+                        reduce=params.smart_reduce,
+                        energy_cache=shared_energy_cache(params.energy_cache_dir),
+                        energy=params.smart_energy
+                    )
+                    plan = splitter.plan(
+                        params.mode, n=params.n, rows=params.rows, cols=params.cols,
+                        **params.smart_search()
+                    )
+
+                with timer.stage("decode"):
+                    image = decoded.image
+                save_all(ImageSlicer.from_image(image).iter_plan(plan))
+
+                log.info("Smart slicing succeeded: %s", filename)
+                return None
+
+            except Exception as smart_error:
+                log.warning("Smart slicing failed, falling back: %s", smart_error)
+
+        # --- FALLBACK / NORMAL PATH ---
+        if params.streaming and not decoded.is_decoded:
+            slicer = StreamingImageSlicer(input_path)
+            if not slicer.streaming:
+                log.info("Streaming not supported for %s; decoding fully", filename)
+        else:
+            with timer.stage("decode"):
+                image = decoded.image
+            slicer = ImageSlicer.from_image(image)
+
+        save_all(slicer.iter_slices(**params.layout()))
+
+        log.info("Completed: %s", filename)
+        return None
+
+    except Exception as e:
+        error_msg = f"{filename} | ERROR: {str(e)}"
+        log.error(error_msg)
+        return error_msg
+
+
+def _process_file_buffered(
+    job: Tuple[str, str, SliceParams]
+) -> Tuple[Optional[str], List[Tuple[int, str, tuple]], float, Dict[str, float]]:
+    """
+    Worker-process entry point: run process_file and hand back its log
+    and timings (wall seconds, per-stage seconds).
+    """
+    input_path, image_output_dir, params = job
+    log = _LogBuffer()
+    timer = StageTimer()
+    start = time.perf_counter()
+    error = process_file(input_path, image_output_dir, params, log, timer)
+    return error, log.records, time.perf_counter() - start, timer.stages
+
+
+def ordered_pool_map(
+    fn: Callable,
+    items: Iterable,
+    workers: int,
+    max_pending: Optional[int] = None,
+    initializer: Optional[Callable] = None
+) -> Iterator:
+    """
+    Map fn over items on a process pool, yielding results in input order.
+
+    At most max_pending jobs (default: 2 per worker) are in flight, so
+    items is consumed lazily and results stream back as they complete.
+    """
+    max_pending = max_pending or workers * 2
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
 
 
 class BatchImageProcessor:
@@ -19,7 +325,7 @@ class BatchImageProcessor:
     Batch processor with optional smart slicing and safe fallback.
     """
 
-    def __init__(self, input_dir: str, output_dir: str, log_dir: str = None):
+    def __init__(self, input_dir: str, output_dir: str, log_dir: str = None, quiet: bool = False):
         if not os.path.isdir(input_dir):
             raise ValueError(f"Input directory does not exist: {input_dir}")
 
@@ -27,7 +333,8 @@ class BatchImageProcessor:
         self.output_dir = output_dir
         os.makedirs(self.output_dir, exist_ok=True)
 
-        self.logger = setup_logger(log_dir)
+        self.logger = setup_logger(log_dir, quiet=quiet)
+        self.metrics_logger = get_metrics_logger()
 
     def _is_image_file(self, filename: str) -> bool:
         return os.path.splitext(filename.lower())[1] in SUPPORTED_EXTENSIONS
@@ -39,80 +346,249 @@ class BatchImageProcessor:
         rows: Optional[int] = None,
         cols: Optional[int] = None,
         output_format: str = "png",
-        smart: bool = False
+        smart: bool = False,
+        workers: int = 1,
+        pipeline: Optional[PipelineConfig] = None,
+        streaming: bool = False,
+        smart_strategy: str = "greedy",
+        smart_reduce: int = 1,
+        smart_multiscale: bool = False,
+        smart_tolerance: Optional[int] = None,
+        energy_cache_dir: Optional[str] = None,
+        smart_energy: str = "canny",
+        incremental: bool = True,
+        recursive: bool = False,
+        include: Optional[Sequence[str]] = None,
+        exclude: Optional[Sequence[str]] = None,
+        encoder_profile: Optional[str] = None,
+        skip_blank: bool = False,
+        dedupe: bool = False,
+        shards: Optional[ShardConfig] = None,
+        tile: Optional[Size] = None,
+        stride: Optional[Size] = None,
+        padding: str = "shift"
     ) -> BatchResult:
+        """
+        Slice every image in input_dir.
 
-        result = BatchResult()
-        files = os.listdir(self.input_dir)
+        workers: number of processes to fan files out to. 1 runs in this
+        process; 0 uses one worker per CPU. Results and log lines are
+        collected in file order either way, so the output tree is identical.
+
+        pipeline: run decode, slicing and encoding as overlapping stages
+        in this process (see batch.pipeline). Cannot be combined with workers.
+
+        streaming: decode one slice row at a time for deterministic slicing
+        (see core.streaming) to bound memory on very large images. The
+        smart path still decodes whole images. Not available in pipeline mode.
+
+        smart_strategy: cut selection for smart slicing, "greedy" or "dp"
+        (minimum total edge energy; see smart.smart_splitter).
+
+        smart_reduce: run the smart energy analysis on a 1/2, 1/4 or 1/8
+        resolution grayscale decode (1 = full resolution).
 
-        self.logger.info(
-            f"Batch started | mode={mode} | smart={smart} | files={len(files)}"
+        smart_multiscale: pick smart cuts on a coarse energy profile (level
+        smart_reduce, default 1/4) and refine them at full resolution within
+        +/- smart_tolerance pixels.
+
+        energy_cache_dir: keep smart energy profiles as .npy files here so
+        worker processes and later runs reuse them. Profiles are always
+        cached in memory (shared with the GUI preview).
+
+        smart_energy: energy function for smart cuts, one of
+        smart.ENERGY_NAMES ("canny", "sobel", "absdiff", "variance",
+        "band"; see smart.energy).
+
+        incremental: skip inputs whose entry in the output dir's processing
+        manifest (batch.manifest) still matches: same parameters, outputs
+        present, file unchanged. Each finished file is recorded as it
+        completes, so an interrupted run resumes where it stopped. With
+        incremental=False every input is reprocessed (and re-recorded).
+
+        recursive: also slice images in subdirectories; outputs mirror the
+        input tree (input/a/b.png -> output/a/b/b_part1.png). Inputs are
+        discovered lazily (batch.discovery), so work starts on the first
+        file while the rest of the tree is still being scanned.
+
+        include / exclude: glob patterns filtering inputs. Patterns with a
+        "/" match the path relative to input_dir, others the file name;
+        excluded directories are not scanned.
+
+        encoder_profile: "fastest", "balanced" or "smallest" encoder
+        settings for the output format (see core.encoding); None keeps
+        Pillow's defaults.
+
+        skip_blank: do not write single-colour or fully transparent tiles;
+        the index records their mode, size and fill colour instead.
+        dedupe: write each distinct tile of an image once; repeats become
+        aliases of the first copy. With either option a `<base>_tiles.json`
+        index maps every tile name to its stored file (see batch.tiles).
+
+        shards: pack tiles into tar, zip or npy shard files under the
+        output dir instead of writing one file per tile, with a JSON-lines
+        tile index (see batch.sinks). Shards are appended by this process,
+        so it cannot be combined with workers; pipeline mode is fine.
+
+        tile / stride / padding: window mode ("window") cuts fixed-size
+        tiles (int or (width, height)) every `stride` pixels (default: tile,
+        no overlap); padding "shift", "drop" or "pad" handles the image
+        edges (see core.plan.window_starts). Not combined with smart.
+        """
+        if workers < 0:
+            raise ValueError("workers must be zero or a positive integer.")
+        if pipeline is not None and workers != 1:
+            raise ValueError("pipeline mode runs in a single process; use workers=1.")
+        if mode == "window" and smart:
+            raise ValueError("smart slicing does not apply to window mode.")
+        if shards is not None and workers != 1:
+            raise ValueError("shard output is written by a single process; use workers=1 or pipeline mode.")
+        if pipeline is not None and streaming:
+            raise ValueError("streaming decode is not available in pipeline mode.")
+        if workers == 0:
+            workers = os.cpu_count() or 1
+
+        result = BatchResult()
+        params = SliceParams(
+            mode, n, rows, cols, output_format, smart,
+            streaming=streaming,
+            smart_strategy=smart_strategy,
+            smart_reduce=smart_reduce,
+            smart_multiscale=smart_multiscale,
+            smart_tolerance=smart_tolerance,
+            energy_cache_dir=energy_cache_dir,
+            smart_energy=smart_energy,
+            encoder_profile=encoder_profile,
+            skip_blank=skip_blank,
+            dedupe=dedupe,
+            tile=tile,
+            stride=stride,
+            padding=padding
         )
+        started, args = "Batch started | mode=%s | smart=%s", [mode, smart]
+        if recursive:
+            started += " | recursive"
+        if workers > 1:
+            started += " | workers=%d"
+            args.append(workers)
+        self.logger.info(started, *args, extra=SUMMARY)
 
-        for filename in files:
-            if not self._is_image_file(filename):
-                continue
+        manifest = ProcessingManifest(self.output_dir)
+        fingerprint = params.fingerprint()
+        if shards is not None:
+            fingerprint["shards"] = shards.kind
 
-            input_path = os.path.join(self.input_dir, filename)
-            base_name = os.path.splitext(filename)[0]
-            image_output_dir = os.path.join(self.output_dir, base_name)
-            os.makedirs(image_output_dir, exist_ok=True)
+        def discover() -> Iterator[str]:
+            for rel_path in iter_image_files(
+                self.input_dir, SUPPORTED_EXTENSIONS,
+                recursive=recursive, include=include, exclude=exclude,
+                skip_dirs=[self.output_dir]
+            ):
+                input_path = os.path.join(self.input_dir, rel_path)
+                if incremental and manifest.is_current(rel_path, input_path, fingerprint):
+                    result.skipped.append(rel_path)
+                    continue
+                yield rel_path
 
-            try:
-                self.logger.info(f"Processing: {filename}")
-
-                # --- SMART PATH (horizontal mode supported only) ---
-                if smart and mode == "horizontal":
-                    try:
-                        self.logger.info("Attempting smart slicing")
-                        splitter = SmartVerticalSplitter(input_path)
-                        images = splitter.split(n)
-
-                        for i, img in enumerate(images, start=1):
-                            out_name = f"{base_name}_part{i}.{output_format}"
-                            img.save(os.path.join(image_output_dir, out_name))
-
-                        self.logger.info(
-                            f"Smart slicing succeeded: {filename}"
-                        )
-                        result.processed.append(filename)
-                        continue
-
-                    except Exception as smart_error:
-                        self.logger.warning(
-                            f"Smart slicing failed, falling back: {smart_error}"
-                        )
-
-                # --- FALLBACK / NORMAL PATH ---
-                slicer = ImageSlicer(input_path)
-                slices = slicer.slice(
-                    mode=mode,
-                    n=n,
-                    rows=rows,
-                    cols=cols
+        # Keys of jobs handed out but not yet finished, in submission order;
+        # every execution path returns results in that same order.
+        in_flight = deque()
+
+        def make_jobs() -> Iterator[Tuple[str, str, SliceParams]]:
+            for rel_path in discover():
+                in_flight.append(rel_path)
+                yield (
+                    os.path.join(self.input_dir, rel_path),
+                    os.path.join(self.output_dir, os.path.splitext(rel_path)[0]),
+                    params
                 )
 
-                for s in slices:
-                    out_name = f"{base_name}_part{s.index}.{output_format}"
-                    s.image.save(os.path.join(image_output_dir, out_name))
+        def finish(error: Optional[str], seconds: float, stages: Dict[str, float]):
+            rel_path = in_flight.popleft()
+            self._record(result, rel_path, error)
+            timing = FileTiming(rel_path, error is None, seconds, stages)
+            result.timings.append(timing)
+            self.metrics_logger.info("%s", timing)  # serialised on the log thread
+            if error is None:
+                rel_base = os.path.splitext(rel_path)[0]
+
+                def record(outputs: List[str]):
+                    manifest.record(rel_path, os.path.join(self.input_dir, rel_path), fingerprint, outputs)
 
-                result.processed.append(filename)
-                self.logger.info(f"Completed: {filename}")
+                if sink is not None:
+                    # Recorded once the shards holding its tiles are closed.
+                    sink.commit(rel_base, record)
+                else:
+                    record(outputs(rel_base))
 
-            except Exception as e:
-                error_msg = f"{filename} | ERROR: {str(e)}"
-                result.failed.append(error_msg)
-                self.logger.error(error_msg)
+        def outputs(rel_base: str) -> List[str]:
+            if params.filters_tiles:
+                return written_outputs(self.output_dir, rel_base)
+            if params.mode == "window":
+                return tile_files(self.output_dir, rel_base, params.output_format)
+            return params.output_names(rel_base)
 
+        jobs = make_jobs()
+        sink = open_sink(self.output_dir, shards) if shards is not None else None
+        run_start = time.perf_counter()
+        try:
+            if pipeline is not None:
+                staged = run_pipeline(
+                    ((path, out_dir) for path, out_dir, _ in jobs),
+                    params, pipeline, self.logger, _LogBuffer, sink
+                )
+                for _, error, seconds, stages in staged:
+                    finish(error, seconds, stages)
+            elif workers > 1:
+                for error, records, seconds, stages in ordered_pool_map(
+                    _process_file_buffered, jobs, workers, initializer=init_worker_logging
+                ):
+                    for level, msg, args in records:
+                        self.logger.log(level, msg, *args)
+                    finish(error, seconds, stages)
+            else:
+                for input_path, image_output_dir, _ in jobs:
+                    timer = StageTimer()
+                    start = time.perf_counter()
+                    error = process_file(input_path, image_output_dir, params, self.logger, timer, sink)
+                    finish(error, time.perf_counter() - start, timer.stages)
+        finally:
+            if sink is not None:
+                sink.close()  # records the images of the last shards
+            manifest.close()
+
+        result.elapsed = time.perf_counter() - run_start
+        manifest.compact()
         self._log_summary(result)
+        flush_logs()  # summary is on disk/console before the caller continues
         return result
 
+    @staticmethod
+    def _record(result: BatchResult, filename: str, error: Optional[str]):
+        if error is None:
+            result.processed.append(filename)
+        else:
+            result.failed.append(error)
+
     def _log_summary(self, result: BatchResult):
-        self.logger.info("Batch completed")
-        self.logger.info(f"Successful: {len(result.processed)}")
-        self.logger.info(f"Failed: {len(result.failed)}")
+        self.logger.info("Batch completed", extra=SUMMARY)
+        self.logger.info("Successful: %d", len(result.processed), extra=SUMMARY)
+        self.logger.info("Failed: %d", len(result.failed), extra=SUMMARY)
+        if result.skipped:
+            self.logger.info("Skipped (unchanged): %d", len(result.skipped), extra=SUMMARY)
+
+        summary = result.stage_summary()
+        if summary:
+            args = [
+                value for stage, stats in summary.items()
+                for value in (stage, stats["sum"], stats["p50"], stats["p90"])
+            ]
+            self.logger.info(
+                "Stage time (sum / p50 / p90 per file, s): " + " | ".join(["%s %.2f / %.3f / %.3f"] * len(summary)),
+                *args, extra=SUMMARY
+            )
 
         if result.failed:
-            self.logger.info("Failed files:")
+            self.logger.info("Failed files:", extra=SUMMARY)
             for f in result.failed:
-                self.logger.info(f"  - {f}")
+                self.logger.info("  - %s", f, extra=SUMMARY)
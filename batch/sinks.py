@@ -0,0 +1,318 @@
+"""
+Sharded output sinks: many tiles per file instead of one file per tile.
+
+  - tar: encoded tiles appended to shard-NNNNN.tar files of bounded size
+  - zip: the same in stored (uncompressed) zip shards
+  - npy: raw pixels stacked into shard-NNNNN.npy tensors of shape
+         (tiles, height, width[, channels]) in the tiles' own dtype,
+         memory-mappable with np.load(path, mmap_mode="r")
+
+Every tile gets one JSON line in `<shard dir>/index.jsonl`: its tile name
+(the path it would have had as a file), source box and the shard plus
+byte offset/length (tar, zip) or row (npy) holding it, so consumers can
+read any tile with a single seek. Later lines win if an input is
+re-sliced. Shards are appended by one process; writer threads share a
+sink through its lock.
+
+A shard is only readable once closed (npy header, zip central directory),
+so an image is reported done to the processing manifest (`commit`) only
+after every shard holding its tiles is closed. A crashed run re-slices
+the images whose shard was still open.
+"""
+
+import abc
+import io
+import json
+import os
+import struct
+import tarfile
+import threading
+import time
+import zipfile
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from PIL import Image
+
+from batch.metrics import encode_tile
+
+SHARD_KINDS = ("tar", "zip", "npy")
+
+# Fixed .npy header size, so the tile count can be patched in place on close.
+_NPY_HEADER_LEN = 128
+
+
+class ShardConfig:
+    """
+    Shard sink settings for a batch run.
+
+    kind: "tar", "zip" or "npy".
+    max_bytes: roll tar/zip shards over after this many bytes.
+    max_tiles: tiles per npy shard.
+    directory: shard directory, relative to the output dir.
+    """
+    def __init__(self, kind: str = "tar", max_bytes: int = 256 * 1024 * 1024, max_tiles: int = 4096,
+                 directory: str = "shards"):
+        if kind not in SHARD_KINDS:
+            raise ValueError(f"Unknown shard kind: {kind}")
+        if max_bytes <= 0 or max_tiles <= 0:
+            raise ValueError("Shard max_bytes and max_tiles must be positive.")
+
+        self.kind = kind
+        self.max_bytes = max_bytes
+        self.max_tiles = max_tiles
+        self.directory = directory
+
+
+class _ShardSink(abc.ABC):
+    """
+    Shared shard bookkeeping: numbering, rollover, index and the outputs
+    touched per image (for the processing manifest).
+    """
+    extension = ""
+
+    def __init__(self, output_dir: str, config: ShardConfig):
+        self.output_dir = output_dir
+        self.config = config
+        self.shard_dir = os.path.join(output_dir, config.directory)
+        os.makedirs(self.shard_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._next_shard = self._first_free_shard()
+        self._shard_name: Optional[str] = None
+        self._index = open(os.path.join(self.shard_dir, "index.jsonl"), "a", encoding="utf-8")
+        self._touched: Dict[str, Set[str]] = {}
+        # (record, outputs) of finished images: waiting for the open shard / ready to report.
+        self._waiting: List[Tuple[Callable[[List[str]], None], List[str]]] = []
+        self._ready: List[Tuple[Callable[[List[str]], None], List[str]]] = []
+
+    def _first_free_shard(self) -> int:
+        # Resumed runs append new shards after the existing ones.
+        numbers = [
+            int(name[6:11]) for name in os.listdir(self.shard_dir)
+            if name.startswith("shard-") and name.endswith(self.extension) and name[6:11].isdigit()
+        ]
+        return max(numbers, default=-1) + 1
+
+    def _new_shard_name(self) -> str:
+        name = f"shard-{self._next_shard:05d}{self.extension}"
+        self._next_shard += 1
+        return name
+
+    def _record(self, tile: str, entry: dict):
+        # Caller holds the lock.
+        entry = dict(tile=tile, **entry)
+        self._index.write(json.dumps(entry) + "\n")
+        if "shard" in entry:
+            image_key = tile.rsplit("/", 1)[0]
+            self._touched.setdefault(image_key, set()).add(entry["shard"])
+
+    def _tile_name(self, out_path: str) -> str:
+        return os.path.relpath(out_path, self.output_dir).replace(os.sep, "/")
+
+    def alias(self, out_path: str, target_path: Optional[str], fill: Optional[dict] = None):
+        """
+        Record a tile that was not stored: an alias of target_path, or
+        (None) a skipped blank tile with its mode, size and fill.
+        """
+        with self._lock:
+            if target_path is None:
+                self._record(self._tile_name(out_path), dict(blank=True, **(fill or {})))
+            else:
+                self._record(self._tile_name(out_path), {"alias": self._tile_name(target_path)})
+
+    def commit(self, rel_base: str, record: Callable[[List[str]], None]):
+        """
+        Report one finished image: record(outputs) is called with the shard
+        files (relative to the output dir) holding its tiles, plus the
+        index, once all of them are closed - now, or when the open shard
+        is. Called on the consuming thread, which also runs the callbacks
+        of images whose shard closed since.
+        """
+        with self._lock:
+            shards = sorted(self._touched.pop(rel_base, ()))
+            prefix = self.config.directory.replace(os.sep, "/")
+            entry = (record, [f"{prefix}/index.jsonl"] + [f"{prefix}/{s}" for s in shards])
+            if self._shard_name is not None and self._shard_name in shards:
+                self._waiting.append(entry)
+            else:
+                self._index.flush()
+                self._ready.append(entry)
+            ready, self._ready = self._ready, []
+
+        for record, outputs in ready:
+            record(outputs)
+
+    def close(self):
+        with self._lock:
+            self._close_shard()
+            self._index.close()
+            ready, self._ready = self._ready, []
+
+        for record, outputs in ready:
+            record(outputs)
+
+    @abc.abstractmethod
+    def put(self, out_path: str, image: Image.Image, box: Tuple[int, int, int, int], timer, options: dict):
+        """
+        Store one tile and record it in the index.
+        """
+
+    @abc.abstractmethod
+    def _close_shard(self):
+        """
+        Finish the open shard, if any, and call _shard_closed. Caller
+        holds the lock.
+        """
+
+    def _shard_closed(self):
+        # Caller holds the lock; the shard file is complete on disk.
+        self._shard_name = None
+        self._index.flush()
+        self._ready.extend(self._waiting)
+        self._waiting = []
+
+
+class TarShardSink(_ShardSink):
+    extension = ".tar"
+
+    def __init__(self, output_dir: str, config: ShardConfig):
+        super().__init__(output_dir, config)
+        self._tar: Optional[tarfile.TarFile] = None
+
+    def put(self, out_path: str, image: Image.Image, box: Tuple[int, int, int, int], timer, options: dict):
+        data = encode_tile(image, out_path, timer, options)
+        tile = self._tile_name(out_path)
+
+        with timer.stage("write"), self._lock:
+            if self._tar is None or self._tar.offset + len(data) > self.config.max_bytes:
+                self._close_shard()
+                self._shard_name = self._new_shard_name()
+                self._tar = tarfile.open(os.path.join(self.shard_dir, self._shard_name), "w", format=tarfile.PAX_FORMAT)
+
+            info = tarfile.TarInfo(tile)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            self._tar.addfile(info, io.BytesIO(data))
+            # Data ends on a 512-byte block boundary at the new offset.
+            offset = self._tar.offset - -(-len(data) // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+            self._record(tile, {"box": list(box), "shard": self._shard_name, "offset": offset, "length": len(data)})
+
+    def _close_shard(self):
+        if self._tar is not None:
+            self._tar.close()
+            self._tar = None
+            self._shard_closed()
+
+
+class ZipShardSink(_ShardSink):
+    extension = ".zip"
+
+    def __init__(self, output_dir: str, config: ShardConfig):
+        super().__init__(output_dir, config)
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._size = 0
+
+    def put(self, out_path: str, image: Image.Image, box: Tuple[int, int, int, int], timer, options: dict):
+        data = encode_tile(image, out_path, timer, options)
+        tile = self._tile_name(out_path)
+
+        with timer.stage("write"), self._lock:
+            if self._zip is None or self._size + len(data) > self.config.max_bytes:
+                self._close_shard()
+                self._shard_name = self._new_shard_name()
+                self._zip = zipfile.ZipFile(os.path.join(self.shard_dir, self._shard_name), "w", zipfile.ZIP_STORED)
+                self._size = 0
+
+            # Images are already compressed; stored entries keep offsets seekable.
+            self._zip.writestr(tile, data)
+            info = self._zip.getinfo(tile)
+            offset = info.header_offset + 30 + len(info.filename.encode("utf-8")) + len(info.extra)
+            self._size = self._zip.fp.tell()
+            self._record(tile, {"box": list(box), "shard": self._shard_name, "offset": offset, "length": len(data)})
+
+    def _close_shard(self):
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+            self._shard_closed()
+
+
+class NpyShardSink(_ShardSink):
+    """
+    Stacks raw tiles into (tiles, H, W[, C]) tensors with the dtype
+    Pillow gives the mode (uint8, bool for "1", uint16 for "I;16", ...).
+    A shard's tile shape and mode come from its first tile: smaller tiles
+    are zero-padded (their true size is in the index), a larger tile or a
+    different mode starts a new shard. Meant for fixed-size grids.
+    """
+    extension = ".npy"
+
+    def __init__(self, output_dir: str, config: ShardConfig):
+        super().__init__(output_dir, config)
+        self._file = None
+        self._shape: Optional[Tuple[int, ...]] = None
+        self._dtype: Optional[np.dtype] = None
+        self._mode: Optional[str] = None
+        self._count = 0
+
+    def put(self, out_path: str, image: Image.Image, box: Tuple[int, int, int, int], timer, options: dict):
+        with timer.stage("encode"):
+            pixels = np.asarray(image)
+        tile = self._tile_name(out_path)
+
+        with timer.stage("write"), self._lock:
+            fits = (
+                self._file is not None
+                and self._count < self.config.max_tiles
+                and self._mode == image.mode
+                and pixels.ndim == len(self._shape)
+                and all(a <= b for a, b in zip(pixels.shape, self._shape))
+            )
+            if not fits:
+                self._close_shard()
+                self._open_shard(pixels.shape, pixels.dtype, image.mode)
+
+            if pixels.shape != self._shape:
+                padded = np.zeros(self._shape, dtype=self._dtype)
+                padded[tuple(slice(0, n) for n in pixels.shape)] = pixels
+                pixels = padded
+            self._file.write(np.ascontiguousarray(pixels).tobytes())
+            self._record(tile, {
+                "box": list(box), "shard": self._shard_name, "row": self._count,
+                "size": [image.width, image.height], "mode": image.mode,
+            })
+            self._count += 1
+
+    def _open_shard(self, shape: Tuple[int, ...], dtype: np.dtype, mode: str):
+        self._shard_name = self._new_shard_name()
+        self._file = open(os.path.join(self.shard_dir, self._shard_name), "wb")
+        self._shape = tuple(shape)
+        self._dtype = dtype
+        self._mode = mode
+        self._count = 0
+        self._file.write(_npy_header((0,) + self._shape, self._dtype))
+
+    def _close_shard(self):
+        if self._file is not None:
+            self._file.seek(0)
+            self._file.write(_npy_header((self._count,) + self._shape, self._dtype))
+            self._file.close()
+            self._file = None
+            self._shard_closed()
+
+
+def _npy_header(shape: Tuple[int, ...], dtype: np.dtype) -> bytes:
+    """
+    .npy v1.0 header for a C-order array, padded to a fixed length.
+    """
+    header = repr({"descr": np.dtype(dtype).str, "fortran_order": False, "shape": tuple(shape)})
+    header = header.ljust(_NPY_HEADER_LEN - 10 - 1) + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1")
+
+
+def open_sink(output_dir: str, config: ShardConfig) -> _ShardSink:
+    """
+    Shard sink of config.kind writing under output_dir.
+    """
+    return {"tar": TarShardSink, "zip": ZipShardSink, "npy": NpyShardSink}[config.kind](output_dir, config)
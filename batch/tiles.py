@@ -0,0 +1,154 @@
+"""
+Blank-tile skipping and duplicate-tile aliasing for batch output.
+
+Each tile is checked before it is encoded:
+  - blank: a single colour, or fully transparent (getextrema, one C pass)
+  - duplicate: same mode, size and pixel bytes as a tile already written
+    for this image (BLAKE2b over the raw tile buffer)
+
+Skipped and aliased tiles are not written. The decision for every tile
+is recorded in a per-image index, `<base>_tiles.json`, mapping each tile
+name to the file holding its pixels (itself, a canonical copy, or null
+for a skipped blank tile). Skipped blank tiles keep their mode, size and
+fill value under "fills", so the image can be rebuilt from the index; a
+fully transparent tile is filled with transparent black (all bands 0).
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Union
+
+from PIL import Image
+
+_ALPHA_MODES = ("RGBA", "LA", "PA", "RGBa", "La")
+
+
+def blank_fill(image: Image.Image) -> Optional[List[Union[int, float]]]:
+    """
+    Band values filling a blank tile (every pixel the same, or all zero
+    for a fully transparent tile), or None if the tile is not blank.
+    """
+    extrema = image.getextrema()
+    if not isinstance(extrema[0], tuple):
+        extrema = (extrema,)  # single-band images
+
+    if image.mode in _ALPHA_MODES and extrema[-1][1] == 0:
+        return [0] * len(extrema)
+    if all(lo == hi for lo, hi in extrema):
+        return [lo for lo, _ in extrema]
+    return None
+
+
+def is_blank(image: Image.Image) -> bool:
+    """
+    True if every pixel has the same value or the tile is fully transparent.
+    """
+    return blank_fill(image) is not None
+
+
+def tile_digest(image: Image.Image) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{image.mode}:{image.size[0]}x{image.size[1]}:".encode())
+    h.update(image.tobytes())
+    return h.hexdigest()
+
+
+def index_name(base_name: str) -> str:
+    return f"{base_name}_tiles.json"
+
+
+class TileFilter:
+    """
+    Decides, tile by tile, whether a tile must be encoded for one image.
+    """
+
+    def __init__(self, skip_blank: bool = False, dedupe: bool = False, timer=None):
+        self.skip_blank = skip_blank
+        self.dedupe = dedupe
+        self.timer = timer
+        self.tiles: Dict[str, Optional[str]] = {}  # tile name -> stored file (None = skipped)
+        self.fills: Dict[str, dict] = {}  # skipped tile name -> mode, size and fill
+        self._seen: Dict[str, str] = {}  # digest -> canonical tile name
+
+    def keep(self, name: str, image: Image.Image) -> bool:
+        """
+        Record the tile; True if it must be written under `name`.
+        """
+        if self.timer is None:
+            return self._keep(name, image)
+        with self.timer.stage("dedupe"):
+            return self._keep(name, image)
+
+    def _keep(self, name: str, image: Image.Image) -> bool:
+        fill = blank_fill(image) if self.skip_blank else None
+        if fill is not None:
+            self.tiles[name] = None
+            self.fills[name] = {"mode": image.mode, "size": list(image.size), "fill": fill}
+            return False
+
+        if self.dedupe:
+            digest = tile_digest(image)
+            canonical = self._seen.get(digest)
+            if canonical is not None:
+                self.tiles[name] = canonical
+                return False
+            self._seen[digest] = name
+
+        self.tiles[name] = name
+        return True
+
+    def write_index(self, image_output_dir: str, base_name: str, source: str, sink=None):
+        """
+        Save the tile decisions as <base>_tiles.json, or as alias/blank
+        records in a shard sink's index when tiles go to shards.
+        """
+        if sink is not None:
+            for name, stored in self.tiles.items():
+                if stored != name:
+                    sink.alias(
+                        os.path.join(image_output_dir, name),
+                        None if stored is None else os.path.join(image_output_dir, stored),
+                        self.fills.get(name)
+                    )
+            return
+
+        index = {
+            "source": source,
+            "tiles": self.tiles,
+            "written": sum(1 for k, v in self.tiles.items() if k == v),
+            "aliased": sum(1 for k, v in self.tiles.items() if v is not None and k != v),
+            "blank": sum(1 for v in self.tiles.values() if v is None),
+            "fills": self.fills,
+        }
+        with open(os.path.join(image_output_dir, index_name(base_name)), "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+
+
+def written_outputs(output_dir: str, rel_base: str) -> List[str]:
+    """
+    Files (relative to output_dir) actually stored for one input with
+    tile filtering on: its index plus the canonical tiles it lists.
+    """
+    base_name = rel_base.rsplit("/", 1)[-1]
+    index_rel = f"{rel_base}/{index_name(base_name)}"
+    with open(os.path.join(output_dir, index_rel), "r", encoding="utf-8") as f:
+        tiles = json.load(f)["tiles"]
+
+    stored = sorted({v for v in tiles.values() if v is not None})
+    return [index_rel] + [f"{rel_base}/{name}" for name in stored]
+
+
+def tile_files(output_dir: str, rel_base: str, output_format: str) -> List[str]:
+    """
+    Tile files (relative to output_dir) found on disk for one input, for
+    layouts whose tile count depends on the image size (window mode).
+    """
+    base_name = rel_base.rsplit("/", 1)[-1]
+    prefix, suffix = f"{base_name}_part", f".{output_format}"
+    with os.scandir(os.path.join(output_dir, rel_base)) as entries:
+        names = sorted(
+            e.name for e in entries
+            if e.name.startswith(prefix) and e.name.endswith(suffix) and e.name[len(prefix):-len(suffix)].isdigit()
+        )
+    return [f"{rel_base}/{name}" for name in names]
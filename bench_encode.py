@@ -0,0 +1,46 @@
+import io
+import time
+import numpy as np
+from PIL import Image
+from core.encoding import ENCODER_PROFILES, pil_save_options
+
+
+def synthetic_tile(width: int, height: int, kind: str, seed: int = 0) -> Image.Image:
+    """
+    "photo": smooth gradients plus noise; "screenshot": flat panels with sharp text-like strokes.
+    """
+    rng = np.random.default_rng(seed)
+    if kind == "photo":
+        y, x = np.mgrid[0:height, 0:width]
+        base = np.stack([x * 255 // width, y * 255 // height, (x + y) * 255 // (width + height)], axis=-1)
+        pixels = np.clip(base + rng.normal(0, 12, base.shape), 0, 255).astype(np.uint8)
+    else:
+        pixels = np.full((height, width, 3), 245, dtype=np.uint8)
+        for _ in range(40):
+            x0, y0 = int(rng.integers(0, width - 40)), int(rng.integers(0, height - 12))
+            pixels[y0:y0 + 2, x0:x0 + int(rng.integers(10, 40))] = rng.integers(0, 80, 3)
+        pixels[:, :width // 6] = (40, 44, 52)
+    return Image.fromarray(pixels)
+
+
+def time_encode(image: Image.Image, fmt: str, options: dict, repeats: int = 3):
+    best = float("inf")
+    size = 0
+    for _ in range(repeats):
+        buffer = io.BytesIO()
+        start = time.perf_counter()
+        image.save(buffer, format=fmt, **options)
+        best = min(best, time.perf_counter() - start)
+        size = buffer.tell()
+    return best * 1000, size
+
+
+print("Encoder profiles: encode ms and bytes per 1024x1024 tile")
+print(f"{'format':>6} {'content':>10} | {'profile':>9} {'ms':>8} {'KiB':>9}")
+
+for fmt in ("PNG", "JPEG", "WEBP"):
+    for kind in ("photo", "screenshot"):
+        tile = synthetic_tile(1024, 1024, kind)
+        for profile in (None,) + ENCODER_PROFILES:
+            ms, size = time_encode(tile, fmt, pil_save_options(fmt, profile))
+            print(f"{fmt:>6} {kind:>10} | {profile or 'default':>9} {ms:>8.1f} {size / 1024:>9.1f}")
@@ -0,0 +1,114 @@
+import time
+import numpy as np
+from PIL import Image
+from core.decoded import DecodedImage
+from smart.energy import ENERGY_FUNCTIONS
+from smart.smart_splitter import SmartVerticalSplitter, _to_gray, select_cuts_dp, select_cuts_greedy
+
+
+def synthetic_energy(width: int, seed: int = 0) -> np.ndarray:
+    """
+    Column energy of a busy wide banner: noise plus a few quiet gutters.
+    """
+    rng = np.random.default_rng(seed)
+    energy = rng.random(width).astype(np.float32)
+    for gutter in rng.choice(width, size=max(1, width // 2000), replace=False):
+        energy[max(0, gutter - 5):gutter + 5] *= 0.05
+    return energy
+
+
+def time_strategy(select, energy: np.ndarray, n: int, repeats: int = 3):
+    min_gap = len(energy) // n
+    best = float("inf")
+    cuts = None
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        try:
+            cuts = select(energy, n, min_gap)
+        except RuntimeError:
+            cuts = None
+        best = min(best, time.perf_counter() - start)
+
+    total = float(energy[cuts].sum()) if cuts else float("nan")
+    return best * 1000, total, cuts is not None
+
+
+def synthetic_banner(width: int, height: int, seed: int = 0) -> Image.Image:
+    """
+    Wide banner: textured panels separated by plain gutters.
+    """
+    rng = np.random.default_rng(seed)
+    pixels = np.full((height, width, 3), 235, dtype=np.uint8)
+    x = 0
+    while x < width:
+        panel = min(int(rng.integers(width // 40, width // 8)), width - x)
+        noise = rng.integers(0, 255, size=(-(-height // 8), -(-panel // 8), 3), dtype=np.uint8)
+        pixels[:, x:x + panel] = noise.repeat(8, axis=0).repeat(8, axis=1)[:height, :panel]
+        x += panel + int(rng.integers(8, 64))
+    return Image.fromarray(pixels)
+
+
+def time_search(decoded: DecodedImage, n: int, repeats: int = 3, **search):
+    best = float("inf")
+    positions = None
+    for _ in range(repeats):
+        # A fresh splitter per repeat: the instance memoises its energy profiles.
+        splitter = SmartVerticalSplitter(decoded=decoded)
+        start = time.perf_counter()
+        positions = splitter.find_split_positions(n, strategy="dp", **search)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, positions
+
+
+def time_energy(energy, gray: np.ndarray, repeats: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        energy(gray)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+print("Smart cut selection: greedy vs dp")
+print(f"{'width':>7} {'n':>4} | {'greedy ms':>10} {'energy':>8} {'ok':>3} | {'dp ms':>8} {'energy':>8} {'ok':>3}")
+
+for width in (2_000, 8_000, 30_000, 60_000):
+    energy = synthetic_energy(width)
+    for n in (3, 12, 48):
+        g_ms, g_total, g_ok = time_strategy(select_cuts_greedy, energy, n)
+        d_ms, d_total, d_ok = time_strategy(select_cuts_dp, energy, n)
+        print(
+            f"{width:>7} {n:>4} | {g_ms:>10.2f} {g_total:>8.3f} {'yes' if g_ok else 'no':>3} |"
+            f" {d_ms:>8.2f} {d_total:>8.3f} {'yes' if d_ok else 'no':>3}"
+        )
+
+
+print()
+print("Smart energy search: full resolution vs multiscale (dp strategy)")
+print(f"{'size':>11} {'n':>3} {'coarse':>6} {'tol':>4} | {'full ms':>8} {'multi ms':>8} {'speedup':>7} {'max drift px':>12}")
+
+for width, height in ((3840, 1080), (7680, 2160), (15360, 2160)):
+    decoded = DecodedImage.from_image("<synthetic>", synthetic_banner(width, height))
+    for n in (3, 8):
+        full_ms, full_pos = time_search(decoded, n)
+        for coarse, tolerance in ((4, 4), (8, 8), (8, 16)):
+            multi_ms, multi_pos = time_search(
+                decoded, n, multiscale=True, coarse=coarse, tolerance=tolerance
+            )
+            drift = max(abs(a - b) for a, b in zip(full_pos, multi_pos))
+            print(
+                f"{width:>5}x{height:<5} {n:>3} {coarse:>6} {tolerance:>4} |"
+                f" {full_ms:>8.1f} {multi_ms:>8.1f} {full_ms / multi_ms:>6.1f}x {drift:>12}"
+            )
+
+
+print()
+print("Smart energy functions: cost per megapixel (column + row profiles)")
+print(f"{'size':>11} | " + " ".join(f"{name:>9}" for name in ENERGY_FUNCTIONS) + "   (ms/MP)")
+
+for width, height in ((1920, 1080), (3840, 2160), (15360, 2160)):
+    gray = _to_gray(synthetic_banner(width, height))
+    megapixels = width * height / 1e6
+    costs = [time_energy(energy, gray) / megapixels for energy in ENERGY_FUNCTIONS.values()]
+    print(f"{width:>5}x{height:<5} | " + " ".join(f"{ms:>9.2f}" for ms in costs))
@@ -1,6 +1,26 @@
 import argparse
 import sys
 from batch.processor import BatchImageProcessor
+from batch.metrics import write_prometheus_textfile
+from batch.pipeline import PipelineConfig
+from batch.sinks import SHARD_KINDS, ShardConfig
+from core.encoding import ENCODER_PROFILES
+from core.plan import WINDOW_PADDING
+from smart.energy import ENERGY_NAMES
+from smart.smart_splitter import ANALYSIS_REDUCTIONS, SPLIT_STRATEGIES
+
+
+def parse_size(value: str):
+    """
+    "512" -> 512, "512x384" -> (512, 384)
+    """
+    try:
+        if "x" in value.lower():
+            width, height = value.lower().split("x")
+            return int(width), int(height)
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected N or WxH, got {value!r}")
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -22,8 +42,8 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--mode",
         required=True,
-        choices=["horizontal", "vertical", "grid"],
-        help="Slicing mode"
+        choices=["horizontal", "vertical", "grid", "window"],
+        help="Slicing mode (window: fixed-size tiles, see --tile)"
     )
 
     parser.add_argument(
@@ -44,12 +64,71 @@ def build_parser() -> argparse.ArgumentParser:
         help="Grid columns (grid mode only)"
     )
 
+    parser.add_argument(
+        "--tile",
+        type=parse_size,
+        help="Tile size as N or WxH (window mode only)"
+    )
+
+    parser.add_argument(
+        "--stride",
+        type=parse_size,
+        help="Window step as N or WxH; smaller than --tile overlaps (default: --tile)"
+    )
+
+    parser.add_argument(
+        "--padding",
+        choices=WINDOW_PADDING,
+        default="shift",
+        help="Window edges: shift last tile inward (default), drop partial tiles, or pad with zeros"
+    )
+
     parser.add_argument(
         "--format",
         default="png",
         help="Output image format (default: png)"
     )
 
+    parser.add_argument(
+        "--encoder-profile",
+        choices=ENCODER_PROFILES,
+        default=None,
+        help="Encoder settings for the output format: fastest, balanced or smallest (default: Pillow defaults)"
+    )
+
+    parser.add_argument(
+        "--skip-blank",
+        action="store_true",
+        help="Do not write single-colour or fully transparent tiles; their mode, size and fill colour are recorded in <name>_tiles.json"
+    )
+
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Write identical tiles of an image once; repeats are recorded as aliases in <name>_tiles.json"
+    )
+
+    parser.add_argument(
+        "--shards",
+        choices=SHARD_KINDS,
+        default=None,
+        help="Pack tiles into tar, zip or npy shard files under <output>/shards with an index.jsonl"
+    )
+
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=256,
+        help="Maximum tar/zip shard size in MiB (default: 256)"
+    )
+
+    parser.add_argument(
+        "--shard-tiles",
+        type=int,
+        default=4096,
+        help="Maximum tiles per npy shard (default: 4096)"
+    )
+
     parser.add_argument(
         "--logs",
         default=None,
@@ -59,7 +138,127 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--smart",
         action="store_true",
-        help="Enable smart slicing (horizontal only)"
+        help="Enable smart (content-aware) slicing with deterministic fallback"
+    )
+
+    parser.add_argument(
+        "--smart-strategy",
+        choices=SPLIT_STRATEGIES,
+        default="greedy",
+        help="Smart cut selection: greedy (default) or dp (minimum total edge energy)"
+    )
+
+    parser.add_argument(
+        "--smart-energy",
+        choices=ENERGY_NAMES,
+        default="canny",
+        help="Smart energy function: canny (default), sobel, absdiff, variance or band"
+    )
+
+    parser.add_argument(
+        "--smart-reduce",
+        type=int,
+        choices=sorted(ANALYSIS_REDUCTIONS),
+        default=1,
+        help="Run smart edge analysis on a 1/N resolution grayscale decode (default: 1)"
+    )
+
+    parser.add_argument(
+        "--smart-multiscale",
+        action="store_true",
+        help="Choose smart cuts at coarse resolution (--smart-reduce, default 4) and refine at full resolution"
+    )
+
+    parser.add_argument(
+        "--smart-tolerance",
+        type=int,
+        default=None,
+        help="Multiscale: full-resolution refinement window in pixels either side (default: coarse factor)"
+    )
+
+    parser.add_argument(
+        "--energy-cache",
+        default=None,
+        help="Directory for cached smart energy profiles (.npy), reused across runs"
+    )
+
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes to slice files in parallel (0 = one per CPU, default: 1)"
+    )
+
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Overlap decode, slicing and encoding in staged threads (single process)"
+    )
+
+    parser.add_argument(
+        "--decode-queue",
+        type=int,
+        default=4,
+        help="Pipeline: decoded images buffered ahead of slicing (default: 4)"
+    )
+
+    parser.add_argument(
+        "--encode-queue",
+        type=int,
+        default=64,
+        help="Pipeline: tiles buffered ahead of the encoders (default: 64)"
+    )
+
+    parser.add_argument(
+        "--encode-threads",
+        type=int,
+        default=4,
+        help="Pipeline: encoder/writer threads (default: 4)"
+    )
+
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Decode one slice row at a time to bound memory on very large images"
+    )
+
+    parser.add_argument(
+        "--recursive",
+        action="store_true",
+        help="Also slice images in subdirectories; outputs mirror the input tree"
+    )
+
+    parser.add_argument(
+        "--include",
+        action="append",
+        metavar="GLOB",
+        help="Only slice inputs matching this glob (repeatable; globs with / match the relative path)"
+    )
+
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        metavar="GLOB",
+        help="Skip inputs and directories matching this glob (repeatable)"
+    )
+
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Summary-only logging: skip per-file progress lines (warnings and errors are kept)"
+    )
+
+    parser.add_argument(
+        "--metrics",
+        default=None,
+        metavar="FILE",
+        help="Write a Prometheus textfile-collector summary (file counts, per-stage timing quantiles) to FILE"
+    )
+
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Reprocess every input, ignoring the output directory's processing manifest"
     )
     return parser
 
@@ -70,8 +269,23 @@ def validate_args(args: argparse.Namespace):
     if args.mode == "grid" and (args.rows is None or args.cols is None):
         raise ValueError("--rows and --cols are required for grid mode")
     
-    if args.smart and args.mode != "horizontal":
-        raise ValueError("Smart slicing is supported only for horizontal mode")
+    if args.mode == "window" and args.tile is None:
+        raise ValueError("--tile is required for window mode")
+
+    if args.mode == "window" and args.smart:
+        raise ValueError("--smart cannot be combined with window mode")
+
+    if args.jobs < 0:
+        raise ValueError("--jobs must be zero or a positive integer")
+
+    if args.pipeline and args.jobs != 1:
+        raise ValueError("--pipeline cannot be combined with --jobs")
+
+    if args.pipeline and args.streaming:
+        raise ValueError("--pipeline cannot be combined with --streaming")
+
+    if args.shards and args.jobs != 1:
+        raise ValueError("--shards cannot be combined with --jobs (use --pipeline for parallel encoding)")
 
 def run():
     parser = build_parser()
@@ -83,7 +297,8 @@ def run():
         processor = BatchImageProcessor(
             input_dir=args.input_dir,
             output_dir=args.output_dir,
-            log_dir=args.logs
+            log_dir=args.logs,
+            quiet=args.quiet
         )
 
         result = processor.process(
@@ -92,8 +307,38 @@ def run():
             rows=args.rows,
             cols=args.cols,
             output_format=args.format,
-            smart=args.smart
+            encoder_profile=args.encoder_profile,
+            skip_blank=args.skip_blank,
+            dedupe=args.dedupe,
+            tile=args.tile,
+            stride=args.stride,
+            padding=args.padding,
+            shards=ShardConfig(
+                kind=args.shards,
+                max_bytes=args.shard_size * 1024 * 1024,
+                max_tiles=args.shard_tiles
+            ) if args.shards else None,
+            smart=args.smart,
+            smart_strategy=args.smart_strategy,
+            smart_energy=args.smart_energy,
+            smart_reduce=args.smart_reduce,
+            smart_multiscale=args.smart_multiscale,
+            smart_tolerance=args.smart_tolerance,
+            energy_cache_dir=args.energy_cache,
+            workers=args.jobs,
+            pipeline=PipelineConfig(
+                decode_queue=args.decode_queue,
+                encode_queue=args.encode_queue,
+                encode_workers=args.encode_threads
+            ) if args.pipeline else None,
+            streaming=args.streaming,
+            incremental=not args.force,
+            recursive=args.recursive,
+            include=args.include,
+            exclude=args.exclude
         )
+        if args.metrics:
+            write_prometheus_textfile(args.metrics, result, result.elapsed)
         sys.exit(1 if result.failed else 0)
 
     except Exception as e:
@@ -1,3 +1,7 @@
 from .slicer import ImageSlicer, ImageSlice
+from .plan import SlicePlan, get_slice_plan
+from .decoded import DecodedImage
+from .streaming import StreamingImageSlicer
+from .array_slicer import ArrayImageSlicer, ArraySlice
 
-__all__ = ["ImageSlicer", "ImageSlice"]
+__all__ = ["ImageSlicer", "ImageSlice", "SlicePlan", "get_slice_plan", "StreamingImageSlicer", "DecodedImage", "ArrayImageSlicer", "ArraySlice"]
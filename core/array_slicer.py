@@ -0,0 +1,127 @@
+"""
+Zero-copy slicing over a NumPy pixel array.
+
+ImageSlicer crops every tile with Image.crop, which allocates and copies
+the tile's pixels. ArrayImageSlicer decodes once into an (H, W[, C])
+array and hands out each tile as a strided view into it, so NumPy/OpenCV
+consumers read tile pixels in place. A PIL image is built (one copy) only
+when a slice's `image` is asked for, e.g. to encode it.
+
+Views share memory with the slicer's array: they stay valid as long as
+any of them is referenced, and writing to one writes to the source.
+"""
+
+from typing import Iterator, List, Optional
+
+import numpy as np
+from PIL import Image
+
+from .plan import SlicePlan
+from .slicer import ImageSlice, ImageSlicer
+
+
+def _to_image(array: np.ndarray, mode: str, palette: Optional[List[int]] = None) -> Image.Image:
+    """
+    PIL image (a copy) of an array in the given mode.
+    """
+    image = Image.fromarray(np.ascontiguousarray(array))
+    if image.mode != mode:
+        # Modes fromarray cannot infer (P, CMYK, YCbCr, ...) share the raw layout.
+        image = Image.frombytes(mode, image.size, np.ascontiguousarray(array).tobytes())
+    if palette is not None:
+        image.putpalette(palette)
+    return image
+
+
+class ArraySlice(ImageSlice):
+    """
+    A slice whose pixels are a view into the slicer's array; the PIL
+    image is created on first access.
+    """
+
+    def __init__(self, array: np.ndarray, index: int, box, mode: str, palette: Optional[List[int]] = None):
+        self._array = array
+        self._image: Optional[Image.Image] = None
+        self.index = index
+        self.box = box
+        self.mode = mode
+        self._palette = palette
+
+    @property
+    def array(self) -> np.ndarray:
+        return self._array
+
+    @property
+    def image(self) -> Image.Image:
+        if self._image is None:
+            self._image = _to_image(self._array, self.mode, self._palette)
+        return self._image
+
+
+class ArrayImageSlicer(ImageSlicer):
+    """
+    ImageSlicer backed by one decoded NumPy array; slices are views.
+
+    Same plans, indices and boxes as ImageSlicer. Boxes reaching past the
+    image (padded window plans) are the only tiles that are copied, into
+    zero-filled arrays.
+    """
+
+    def __init__(self, image_path: str):
+        with Image.open(image_path) as source:
+            self._from_pil(source)
+
+    @classmethod
+    def from_image(cls, image: Image.Image) -> "ArrayImageSlicer":
+        slicer = cls.__new__(cls)
+        slicer._from_pil(image)
+        return slicer
+
+    @classmethod
+    def from_array(cls, array: np.ndarray, mode: Optional[str] = None) -> "ArrayImageSlicer":
+        """
+        Slice an existing (H, W[, C]) array in place (no copy). mode is the
+        PIL mode used when slices are turned into images; by default it is
+        inferred as Image.fromarray would.
+        """
+        if array.ndim not in (2, 3):
+            raise ValueError("Pixel array must have shape (H, W) or (H, W, C).")
+
+        slicer = cls.__new__(cls)
+        slicer.array = array
+        slicer.height, slicer.width = array.shape[:2]
+        slicer.mode = mode or Image.fromarray(array[:1, :1]).mode
+        slicer.info = {}
+        slicer._palette = None
+        return slicer
+
+    def _from_pil(self, image: Image.Image):
+        # The only full copy: decoded pixels into the backing array.
+        self.array = np.asarray(image)
+        self.width, self.height = image.size
+        self.mode = image.mode
+        self.info = image.info
+        self._palette = image.getpalette() if image.mode in ("P", "PA") else None
+
+    @property
+    def image(self) -> Image.Image:
+        """
+        The whole image as PIL (a copy; prefer `array`).
+        """
+        return _to_image(self.array, self.mode, self._palette)
+
+    def as_array(self) -> np.ndarray:
+        return self.array
+
+    def iter_plan(self, plan: SlicePlan) -> Iterator[ArraySlice]:
+        if (plan.width, plan.height) != (self.width, self.height):
+            raise ValueError("Slice plan geometry does not match image size.")
+
+        for index, box in plan:
+            x0, y0, x1, y1 = box
+            if x1 <= self.width and y1 <= self.height:
+                tile = self.array[y0:y1, x0:x1]
+            else:
+                tile = np.zeros((y1 - y0, x1 - x0) + self.array.shape[2:], dtype=self.array.dtype)
+                tile[:min(y1, self.height) - y0, :min(x1, self.width) - x0] = self.array[y0:y1, x0:x1]
+            yield ArraySlice(tile, index, box, self.mode, self._palette)
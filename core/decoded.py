@@ -0,0 +1,65 @@
+from typing import Optional, Tuple
+from PIL import Image
+
+
+class DecodedImage:
+    """
+    Shared handle to one input image, decoded at most once.
+
+    Smart analysis and deterministic slicing both read pixels through the
+    same handle, so a file that tries smart slicing and then falls back is
+    not decoded again. Opening the handle only reads the header.
+
+    path is None for pixels that never came from a file (e.g. video
+    frames); such images are not looked up in the energy cache.
+    """
+
+    def __init__(self, path: Optional[str], image: Optional[Image.Image] = None):
+        if path is None and image is None:
+            raise ValueError("DecodedImage needs a path or an image.")
+        self.path = path
+        self._image = image
+
+        if image is None:
+            header = Image.open(path)
+            self.size: Tuple[int, int] = header.size
+            self.format = header.format
+        else:
+            self.size = image.size
+            self.format = image.format
+
+    @classmethod
+    def from_image(cls, path: Optional[str], image: Image.Image) -> "DecodedImage":
+        """
+        Wrap an image that has already been decoded elsewhere (e.g. a reader stage).
+        """
+        return cls(path, image)
+
+    @property
+    def width(self) -> int:
+        return self.size[0]
+
+    @property
+    def height(self) -> int:
+        return self.size[1]
+
+    @property
+    def is_decoded(self) -> bool:
+        return self._image is not None
+
+    @property
+    def image(self) -> Image.Image:
+        """
+        Full-resolution pixels, decoded on first access.
+        """
+        if self._image is None:
+            image = Image.open(self.path)
+            image.load()
+            self._image = image
+        return self._image
+
+    def release(self):
+        """
+        Drop the decoded pixels; the next access decodes again.
+        """
+        self._image = None
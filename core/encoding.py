@@ -0,0 +1,122 @@
+"""
+Named encoder profiles for slice and frame output.
+
+A profile trades encode time against file size:
+  - fastest:  minimal compression effort (large files, cheap to write)
+  - balanced: moderate effort, close to each library's defaults
+  - smallest: maximum effort (and, for lossy formats, slightly lower quality)
+
+Each backend gets its own parameter form: Pillow save() keywords, OpenCV
+imwrite() flags and ffmpeg encoder arguments. Formats without tunables
+map to empty parameters, and profile None means "library defaults", so
+existing output is unchanged unless a profile is chosen.
+"""
+
+from typing import Dict, List, Optional
+
+ENCODER_PROFILES = ("fastest", "balanced", "smallest")
+
+_FORMAT_ALIASES = {"jpg": "jpeg", "tif": "tiff"}
+
+# Pillow Image.save() keyword arguments per format and profile.
+_PIL_OPTIONS: Dict[str, Dict[str, dict]] = {
+    "png": {
+        "fastest": {"compress_level": 1},
+        "balanced": {"compress_level": 6},
+        "smallest": {"compress_level": 9, "optimize": True},
+    },
+    "jpeg": {
+        # subsampling 2 = 4:2:0
+        "fastest": {"quality": 85, "subsampling": 2},
+        "balanced": {"quality": 85, "subsampling": 2, "optimize": True},
+        "smallest": {"quality": 75, "subsampling": 2, "optimize": True, "progressive": True},
+    },
+    "webp": {
+        "fastest": {"lossless": False, "quality": 80, "method": 0},
+        "balanced": {"lossless": False, "quality": 80, "method": 4},
+        "smallest": {"lossless": False, "quality": 75, "method": 6},
+    },
+    "tiff": {
+        "fastest": {},
+        "balanced": {"compression": "tiff_lzw"},
+        "smallest": {"compression": "tiff_adobe_deflate"},
+    },
+}
+
+# ffmpeg image-encoder arguments (placed before the output pattern).
+_FFMPEG_ARGS: Dict[str, Dict[str, List[str]]] = {
+    "png": {
+        "fastest": ["-compression_level", "1"],
+        "balanced": ["-compression_level", "6"],
+        "smallest": ["-compression_level", "9", "-pred", "mixed"],
+    },
+    "jpeg": {
+        "fastest": ["-q:v", "2"],
+        "balanced": ["-q:v", "3"],
+        "smallest": ["-q:v", "5"],
+    },
+    "webp": {
+        "fastest": ["-compression_level", "0", "-quality", "80"],
+        "balanced": ["-compression_level", "4", "-quality", "80"],
+        "smallest": ["-compression_level", "6", "-quality", "75"],
+    },
+    "tiff": {
+        "fastest": ["-compression_algo", "raw"],
+        "balanced": ["-compression_algo", "lzw"],
+        "smallest": ["-compression_algo", "deflate"],
+    },
+}
+
+
+def _normalise(fmt: str, profile: Optional[str]) -> str:
+    if profile is not None and profile not in ENCODER_PROFILES:
+        raise ValueError(f"Unknown encoder profile: {profile}")
+    fmt = fmt.lower().lstrip(".")
+    return _FORMAT_ALIASES.get(fmt, fmt)
+
+
+def pil_save_options(fmt: str, profile: Optional[str]) -> dict:
+    """
+    Keyword arguments for PIL Image.save() in the given output format.
+    """
+    fmt = _normalise(fmt, profile)
+    if profile is None:
+        return {}
+    return dict(_PIL_OPTIONS.get(fmt, {}).get(profile, {}))
+
+
+def cv2_imwrite_params(fmt: str, profile: Optional[str]) -> List[int]:
+    """
+    Flag list for cv2.imwrite() in the given output format.
+    """
+    fmt = _normalise(fmt, profile)
+    if profile is None:
+        return []
+
+    import cv2
+
+    if fmt == "png":
+        # Same zlib levels as the Pillow and ffmpeg tables, so sizes match across backends.
+        level = {"fastest": 1, "balanced": 6, "smallest": 9}[profile]
+        return [int(cv2.IMWRITE_PNG_COMPRESSION), level]
+    if fmt == "jpeg":
+        quality = 75 if profile == "smallest" else 85
+        params = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
+        if profile != "fastest":
+            params += [int(cv2.IMWRITE_JPEG_OPTIMIZE), 1]
+        if profile == "smallest":
+            params += [int(cv2.IMWRITE_JPEG_PROGRESSIVE), 1]
+        return params
+    if fmt == "webp":
+        return [int(cv2.IMWRITE_WEBP_QUALITY), 75 if profile == "smallest" else 80]
+    return []
+
+
+def ffmpeg_encoder_args(fmt: str, profile: Optional[str]) -> List[str]:
+    """
+    Encoder arguments for ffmpeg image-sequence output in the given format.
+    """
+    fmt = _normalise(fmt, profile)
+    if profile is None:
+        return []
+    return list(_FFMPEG_ARGS.get(fmt, {}).get(profile, []))
@@ -0,0 +1,275 @@
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+PLAN_CACHE_SIZE = 128
+
+# Edge policies for window mode (see window_starts).
+WINDOW_PADDING = ("shift", "drop", "pad")
+
+Size = Union[int, Tuple[int, int]]
+
+
+def compute_segments(total_pixels: int, n: int) -> List[int]:
+    """
+    Evenly split pixels into n segments.
+    Distributes remainder pixels from the start.
+    """
+    if n <= 0:
+        raise ValueError("Number of segments must be greater than zero.")
+    if n > total_pixels:
+        raise ValueError("Number of segments exceeds pixel dimension.")
+
+    base = total_pixels // n
+    remainder = total_pixels % n
+
+    return [
+        base + 1 if i < remainder else base
+        for i in range(n)
+    ]
+
+
+def _edges(total_pixels: int, n: int) -> np.ndarray:
+    """
+    Segment boundaries [0, ..., total_pixels] for n even segments.
+    """
+    edges = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(compute_segments(total_pixels, n), out=edges[1:])
+    return edges
+
+
+def _pair(value: Size) -> Tuple[int, int]:
+    if isinstance(value, (tuple, list)):
+        width, height = value
+    else:
+        width = height = value
+    return int(width), int(height)
+
+
+def window_starts(total_pixels: int, tile: int, stride: int, padding: str = "shift") -> np.ndarray:
+    """
+    Start offsets of fixed-size windows along one axis.
+
+    shift: windows every `stride` pixels, plus one flush with the far edge
+           if the last regular window stops short of it (full coverage,
+           every window inside the image)
+    drop:  only the regular windows that fit; a remainder is not covered
+    pad:   regular windows until the image is covered; the last ones may
+           extend past the edge and are zero-padded when cropped
+    """
+    if tile <= 0 or stride <= 0:
+        raise ValueError("Tile size and stride must be greater than zero.")
+    if padding not in WINDOW_PADDING:
+        raise ValueError(f"Unsupported window padding: {padding}")
+
+    if padding == "pad":
+        count = -(-max(total_pixels - tile, 0) // stride) + 1
+        return np.arange(count, dtype=np.int32) * stride
+
+    if tile > total_pixels:
+        raise ValueError("Tile size exceeds pixel dimension.")
+    starts = np.arange(0, total_pixels - tile + 1, stride, dtype=np.int32)
+    if padding == "shift" and starts[-1] + tile < total_pixels:
+        starts = np.append(starts, np.int32(total_pixels - tile))
+    return starts
+
+
+class SlicePlan:
+    """
+    Precomputed slice boxes for one image geometry.
+
+    x_edges / y_edges hold the cut boundaries (including 0 and the full
+    size) and boxes is an (N, 4) int32 array of (left, top, right, bottom)
+    in slice-index order. All arrays are read-only so plans can be shared
+    through the cache.
+
+    Window plans (mode "window") hold fixed-size tiles every `stride`
+    pixels, which may overlap; their x_edges / y_edges are the window
+    start offsets and, with padding "pad", boxes may extend past the image.
+    """
+    __slots__ = (
+        "width", "height", "mode", "n", "rows", "cols", "tile", "stride", "padding",
+        "x_edges", "y_edges", "boxes"
+    )
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        mode: str,
+        n: Optional[int] = None,
+        rows: Optional[int] = None,
+        cols: Optional[int] = None,
+        tile: Optional[Size] = None,
+        stride: Optional[Size] = None,
+        padding: str = "shift"
+    ):
+        if mode == "window":
+            if tile is None:
+                raise ValueError("Window slicing requires tile.")
+            tile = _pair(tile)
+            stride = _pair(stride) if stride is not None else tile
+            x_starts = window_starts(width, tile[0], stride[0], padding)
+            y_starts = window_starts(height, tile[1], stride[1], padding)
+
+            # Row-major, like the other modes, built with broadcasting.
+            boxes = np.empty((len(y_starts), len(x_starts), 4), dtype=np.int32)
+            boxes[..., 0] = x_starts[None, :]
+            boxes[..., 1] = y_starts[:, None]
+            boxes[..., 2] = x_starts[None, :] + tile[0]
+            boxes[..., 3] = y_starts[:, None] + tile[1]
+
+            self._set(width, height, mode, n, rows, cols, x_starts, y_starts, boxes.reshape(-1, 4))
+            self.tile, self.stride, self.padding = tile, stride, padding
+            return
+
+        if mode == "horizontal":
+            if n is None:
+                raise ValueError("Horizontal slicing requires n.")
+            x_edges = _edges(width, n)
+            y_edges = np.array([0, height], dtype=np.int32)
+
+        elif mode == "vertical":
+            if n is None:
+                raise ValueError("Vertical slicing requires n.")
+            x_edges = np.array([0, width], dtype=np.int32)
+            y_edges = _edges(height, n)
+
+        elif mode == "grid":
+            if rows is None or cols is None:
+                raise ValueError("Grid slicing requires rows and cols.")
+            y_edges = _edges(height, rows)
+            x_edges = _edges(width, cols)
+
+        else:
+            raise ValueError(f"Unsupported slicing mode: {mode}")
+
+        self._assign(width, height, mode, n, rows, cols, x_edges, y_edges)
+
+    @classmethod
+    def from_edges(
+        cls,
+        width: int,
+        height: int,
+        mode: str,
+        x_edges: List[int],
+        y_edges: List[int],
+        n: Optional[int] = None,
+        rows: Optional[int] = None,
+        cols: Optional[int] = None
+    ) -> "SlicePlan":
+        """
+        Plan with explicit (e.g. content-aware) cut boundaries.
+
+        Edges must start at 0, end at the image size and strictly increase.
+        Such plans are not entered in the shared plan cache.
+        """
+        x_edges = np.asarray(x_edges, dtype=np.int32)
+        y_edges = np.asarray(y_edges, dtype=np.int32)
+
+        for edges, size in ((x_edges, width), (y_edges, height)):
+            if len(edges) < 2 or edges[0] != 0 or edges[-1] != size or np.any(np.diff(edges) <= 0):
+                raise ValueError("Slice edges must increase strictly from 0 to the image size.")
+
+        plan = cls.__new__(cls)
+        plan._assign(width, height, mode, n, rows, cols, x_edges, y_edges)
+        return plan
+
+    def _assign(self, width, height, mode, n, rows, cols, x_edges, y_edges):
+        # Row-major boxes: every column of the first row, then the next row...
+        n_rows, n_cols = len(y_edges) - 1, len(x_edges) - 1
+        boxes = np.empty((n_rows * n_cols, 4), dtype=np.int32)
+        boxes[:, 0] = np.tile(x_edges[:-1], n_rows)
+        boxes[:, 1] = np.repeat(y_edges[:-1], n_cols)
+        boxes[:, 2] = np.tile(x_edges[1:], n_rows)
+        boxes[:, 3] = np.repeat(y_edges[1:], n_cols)
+
+        self._set(width, height, mode, n, rows, cols, x_edges, y_edges, boxes)
+        self.tile = self.stride = self.padding = None
+
+    def _set(self, width, height, mode, n, rows, cols, x_edges, y_edges, boxes):
+        for arr in (x_edges, y_edges, boxes):
+            arr.flags.writeable = False
+
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.n = n
+        self.rows = rows
+        self.cols = cols
+        self.x_edges = x_edges
+        self.y_edges = y_edges
+        self.boxes = boxes
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def __iter__(self) -> Iterator[Tuple[int, Tuple[int, int, int, int]]]:
+        """
+        Yield (index, box) pairs with 1-based indices, as used for output names.
+        """
+        for index, box in enumerate(self.boxes.tolist(), start=1):
+            yield index, tuple(box)
+
+    def box(self, index: int) -> Tuple[int, int, int, int]:
+        """
+        Box of the slice with the given 1-based index.
+        """
+        return tuple(self.boxes[index - 1].tolist())
+
+    @property
+    def uniform(self) -> bool:
+        """
+        True if every box has the same size (window plans always do).
+        """
+        sizes = self.boxes[:, 2:] - self.boxes[:, :2]
+        return bool(np.all(sizes == sizes[0]))
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def _cached_plan(width, height, mode, n, rows, cols, tile, stride, padding) -> SlicePlan:
+    return SlicePlan(width, height, mode, n=n, rows=rows, cols=cols, tile=tile, stride=stride, padding=padding)
+
+
+def get_slice_plan(
+    width: int,
+    height: int,
+    mode: str,
+    n: Optional[int] = None,
+    rows: Optional[int] = None,
+    cols: Optional[int] = None,
+    tile: Optional[Size] = None,
+    stride: Optional[Size] = None,
+    padding: str = "shift"
+) -> SlicePlan:
+    """
+    Return the shared SlicePlan for a geometry, building it on first use.
+
+    Parameters the mode ignores are dropped from the cache key, so e.g.
+    a stale rows value does not split the cache for horizontal plans.
+    """
+    if mode == "window":
+        n = rows = cols = None
+        if tile is not None:
+            tile = _pair(tile)
+            stride = _pair(stride) if stride is not None else tile
+    else:
+        tile = stride = None
+        padding = "shift"
+        if mode == "grid":
+            n = None
+        else:
+            rows = cols = None
+    return _cached_plan(width, height, mode, n, rows, cols, tile, stride, padding)
+
+
+def plan_cache_info():
+    """
+    Hit/miss statistics of the shared plan cache (functools.lru_cache info).
+    """
+    return _cached_plan.cache_info()
+
+
+def clear_plan_cache():
+    _cached_plan.cache_clear()
@@ -1,7 +1,9 @@
+import numpy as np
 from PIL import Image
-from typing import List, Tuple, Literal
+from typing import Iterator, List, Optional, Tuple, Literal
+from .plan import Size, SlicePlan, compute_segments, get_slice_plan
 
-SliceMode = Literal["horizontal", "vertical", "grid"]
+SliceMode = Literal["horizontal", "vertical", "grid", "window"]
 
 
 class ImageSlice:
@@ -13,11 +15,18 @@ class ImageSlice:
         self.index = index
         self.box = box
 
+    @property
+    def array(self) -> np.ndarray:
+        """
+        Tile pixels as an (H, W[, C]) array.
+        """
+        return np.asarray(self.image)
+
 
 class ImageSlicer:
     """
     Core image slicing engine.
-    Supports horizontal, vertical, and grid slicing.
+    Supports horizontal, vertical, grid and fixed-size window slicing.
     """
 
     def __init__(self, image_path: str):
@@ -25,99 +34,110 @@ class ImageSlicer:
         self.width, self.height = self.image.size
         self.info = self.image.info  # metadata preserved in memory
 
+    @classmethod
+    def from_image(cls, image: Image.Image) -> "ImageSlicer":
+        """
+        Build a slicer around an already-decoded image (no file access).
+        """
+        slicer = cls.__new__(cls)
+        slicer.image = image
+        slicer.width, slicer.height = image.size
+        slicer.info = image.info
+        return slicer
+
     @staticmethod
     def _compute_segments(total_pixels: int, n: int) -> List[int]:
         """
         Evenly split pixels into n segments.
         Distributes remainder pixels from the start.
         """
-        if n <= 0:
-            raise ValueError("Number of segments must be greater than zero.")
-        if n > total_pixels:
-            raise ValueError("Number of segments exceeds pixel dimension.")
-
-        base = total_pixels // n
-        remainder = total_pixels % n
-
-        return [
-            base + 1 if i < remainder else base
-            for i in range(n)
-        ]
+        return compute_segments(total_pixels, n)
 
     # Public wrapper so other modules (GUI) don't use protected API
     def compute_segments(self, total_pixels: int, n: int) -> List[int]:
         return self._compute_segments(total_pixels, n)
 
-    def slice(self, mode: SliceMode, n: int = None, rows: int = None, cols: int = None) -> List[ImageSlice]:
+    def slice(
+        self, mode: SliceMode, n: int = None, rows: int = None, cols: int = None,
+        tile: Optional[Size] = None, stride: Optional[Size] = None, padding: str = "shift"
+    ) -> List[ImageSlice]:
         """
         Unified slicing API.
 
         horizontal: n required
         vertical: n required
         grid: rows and cols required
+        window: tile required (int or (width, height)); stride defaults to
+                tile (no overlap); padding "shift", "drop" or "pad" decides
+                the image edges (see core.plan.window_starts)
         """
-        if mode == "horizontal":
-            if n is None:
-                raise ValueError("Horizontal slicing requires n.")
-            return self._slice_horizontal(n)
-
-        if mode == "vertical":
-            if n is None:
-                raise ValueError("Vertical slicing requires n.")
-            return self._slice_vertical(n)
-
-        if mode == "grid":
-            if rows is None or cols is None:
-                raise ValueError("Grid slicing requires rows and cols.")
-            return self._slice_grid(rows, cols)
-
-        raise ValueError(f"Unsupported slicing mode: {mode}")
-
-    def _slice_horizontal(self, n: int) -> List[ImageSlice]:
-        widths = self._compute_segments(self.width, n)
-        slices = []
+        return list(self.iter_slices(mode, n=n, rows=rows, cols=cols, tile=tile, stride=stride, padding=padding))
 
-        x = 0
-        for i, w in enumerate(widths, start=1):
-            box = (x, 0, x + w, self.height)
-            cropped = self.image.crop(box)
-            slices.append(ImageSlice(cropped, i, box))
-            x += w
-
-        return slices
-
-    def _slice_vertical(self, n: int) -> List[ImageSlice]:
-        heights = self._compute_segments(self.height, n)
-        slices = []
-
-        y = 0
-        for i, h in enumerate(heights, start=1):
-            box = (0, y, self.width, y + h)
-            cropped = self.image.crop(box)
-            slices.append(ImageSlice(cropped, i, box))
-            y += h
+    def plan(
+        self, mode: SliceMode, n: int = None, rows: int = None, cols: int = None,
+        tile: Optional[Size] = None, stride: Optional[Size] = None, padding: str = "shift"
+    ) -> SlicePlan:
+        """
+        Cached SlicePlan for this image's size; shared by every image of the same geometry.
+        """
+        return get_slice_plan(
+            self.width, self.height, mode, n=n, rows=rows, cols=cols, tile=tile, stride=stride, padding=padding
+        )
+
+    def iter_slices(
+        self, mode: SliceMode, n: int = None, rows: int = None, cols: int = None,
+        tile: Optional[Size] = None, stride: Optional[Size] = None, padding: str = "shift"
+    ) -> Iterator[ImageSlice]:
+        """
+        Lazy variant of slice().
 
-        return slices
+        Arguments are validated immediately, but each tile is cropped only
+        when the iterator reaches it, so a consumer that saves and drops
+        tiles one at a time holds a single tile in memory.
+        """
+        return self.iter_plan(self.plan(mode, n=n, rows=rows, cols=cols, tile=tile, stride=stride, padding=padding))
 
-    def _slice_grid(self, rows: int, cols: int) -> List[ImageSlice]:
+    def iter_plan(self, plan: SlicePlan) -> Iterator[ImageSlice]:
         """
-        Slice image into a rows × cols grid.
+        Lazily crop the boxes of a precomputed plan.
         """
-        row_heights = self._compute_segments(self.height, rows)
-        col_widths = self._compute_segments(self.width, cols)
+        if (plan.width, plan.height) != (self.width, self.height):
+            raise ValueError("Slice plan geometry does not match image size.")
 
-        slices = []
-        index = 1
-        y = 0
+        for index, box in plan:
+            yield ImageSlice(self.image.crop(box), index, box)
 
-        for rh in row_heights:
-            x = 0
-            for cw in col_widths:
-                box = (x, y, x + cw, y + rh)
-                cropped = self.image.crop(box)
-                slices.append(ImageSlice(cropped, index, box))
-                index += 1
-                x += cw
-            y += rh
+    def as_array(self) -> np.ndarray:
+        """
+        The decoded image as an (H, W[, C]) array.
+        """
+        return np.asarray(self.image)
 
-        return slices
+    def to_batch(self, plan: SlicePlan) -> np.ndarray:
+        """
+        All tiles of a uniform plan (e.g. a window plan) as one
+        (N, H, W[, C]) array gathered straight from the decoded buffer,
+        in slice-index order. Areas outside the image are zero, as with
+        crop().
+        """
+        if (plan.width, plan.height) != (self.width, self.height):
+            raise ValueError("Slice plan geometry does not match image size.")
+        if not plan.uniform:
+            raise ValueError("Batched output needs tiles of one size.")
+
+        pixels = self.as_array()
+        left, top = plan.boxes[:, 0], plan.boxes[:, 1]
+        tile_w, tile_h = (plan.boxes[0, 2:] - plan.boxes[0, :2]).tolist()
+
+        # Padded plans reach past the right/bottom edge; pad once up front.
+        pad_x = max(int(plan.boxes[:, 2].max()) - self.width, 0)
+        pad_y = max(int(plan.boxes[:, 3].max()) - self.height, 0)
+        if pad_x or pad_y:
+            pixels = np.pad(pixels, ((0, pad_y), (0, pad_x)) + ((0, 0),) * (pixels.ndim - 2))
+
+        # One fancy-indexing gather over a strided view of every window.
+        windows = np.lib.stride_tricks.sliding_window_view(pixels, (tile_h, tile_w), axis=(0, 1))
+        batch = windows[top, left]  # (N, [C,] H, W)
+        if batch.ndim == 4:
+            batch = np.moveaxis(batch, 1, -1)
+        return np.ascontiguousarray(batch)
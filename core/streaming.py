@@ -0,0 +1,248 @@
+"""
+Memory-bounded slicing for very large images.
+
+ImageSlicer crops from a fully decoded raster. StreamingImageSlicer instead
+decodes one band (the rows of a single row of slices) at a time and drops
+it before moving on, so peak memory follows one slice row rather than the
+whole image.
+
+Band readers, tried in order:
+  - raw:      layouts Pillow stores as uncompressed row data (uncompressed
+              TIFF strips/tiles, BMP, PPM/PGM); rows are read straight from
+              their file offsets.
+  - tifffile: compressed strip/tile TIFFs, decoding only the strips/tiles
+              that intersect the band (optional `tifffile` package). Only
+              8-bit grayscale (MINISBLACK) and RGB, optionally with an
+              unassociated alpha sample; palette, CMYK, MINISWHITE, YCbCr
+              and other photometrics need Pillow's colour handling.
+  - full:     anything else falls back to a full decode. This includes
+              PNG and JPEG: Pillow decodes them only as a whole, so they
+              are not streamed.
+"""
+
+from functools import lru_cache
+from itertools import groupby
+from typing import Iterator
+
+from PIL import Image
+
+from .plan import SlicePlan
+from .slicer import ImageSlice, ImageSlicer
+
+# (photometric, samples per pixel, extra samples) -> mode, for layouts
+# whose samples are the pixel values as-is.
+_TIFF_MINISBLACK, _TIFF_RGB, _TIFF_UNASSOC_ALPHA = 1, 2, 2
+_TIFF_MODES = {
+    (_TIFF_MINISBLACK, 1, ()): "L",
+    (_TIFF_RGB, 3, ()): "RGB",
+    (_TIFF_RGB, 4, (_TIFF_UNASSOC_ALPHA,)): "RGBA",
+}
+
+
+@lru_cache(maxsize=None)
+def _raw_bits_per_pixel(mode: str, rawmode: str) -> int:
+    """
+    Bits per pixel of a Pillow raw mode, found by packing 8 pixels.
+    """
+    for nbytes in range(1, 65):
+        try:
+            Image.frombytes(mode, (8, 1), b"\0" * nbytes, "raw", rawmode)
+            return nbytes
+        except ValueError:
+            continue
+    raise ValueError(f"Unsupported raw mode: {rawmode}")
+
+
+class _RawBandReader:
+    """
+    Reads bands from Pillow "raw" tiles without decoding the rest of the file.
+    """
+    name = "raw"
+
+    def __init__(self, path: str, image: Image.Image):
+        if image.mode in ("P", "PA"):
+            raise ValueError("Palette images are not streamed.")
+        if not image.tile or any(t[0] != "raw" for t in image.tile):
+            raise ValueError("Image is not stored as raw rows.")
+
+        self.path = path
+        self.mode = image.mode
+        self.width, self.height = image.size
+        self.tiles = []
+
+        for codec, extents, offset, args in image.tile:
+            if isinstance(args, str):
+                args = (args,)
+            rawmode = args[0]
+            stride = args[1] if len(args) > 1 else 0
+            ystep = args[2] if len(args) > 2 else 1
+            x0, y0, x1, y1 = extents
+            if not stride:
+                bits = _raw_bits_per_pixel(self.mode, rawmode)
+                stride = ((x1 - x0) * bits + 7) // 8
+            self.tiles.append((extents, offset, rawmode, stride, ystep))
+
+    def read(self, y0: int, y1: int) -> Image.Image:
+        band = None
+
+        with open(self.path, "rb") as fp:
+            for (x0, ty0, x1, ty1), offset, rawmode, stride, ystep in self.tiles:
+                a, b = max(y0, ty0), min(y1, ty1)
+                if a >= b:
+                    continue
+
+                # Rows are contiguous in either direction; bottom-up data
+                # (ystep == -1, e.g. BMP) stores row ty1 - 1 first.
+                first_row = a - ty0 if ystep == 1 else ty1 - b
+                fp.seek(offset + first_row * stride)
+                data = fp.read((b - a) * stride)
+
+                part = Image.frombytes(
+                    self.mode, (x1 - x0, b - a), data, "raw", rawmode, stride, ystep
+                )
+
+                if (x0, x1, a, b) == (0, self.width, y0, y1):
+                    return part
+                if band is None:
+                    band = Image.new(self.mode, (self.width, y1 - y0))
+                band.paste(part, (x0, a - y0))
+
+        if band is None:
+            raise ValueError(f"No image data found for rows {y0}-{y1}.")
+        return band
+
+
+class _TiffSegmentBandReader:
+    """
+    Reads bands from (possibly compressed) strip/tile TIFFs via tifffile,
+    decoding only the segments that intersect the requested rows.
+    """
+    name = "tifffile"
+
+    def __init__(self, path: str):
+        import numpy as np
+        import tifffile
+
+        self._np = np
+        self.path = path
+
+        with tifffile.TiffFile(path) as tif:
+            page = tif.pages[0]
+            if page.planarconfig != 1 or page.imagedepth != 1:
+                raise ValueError("Only contiguous, single-plane TIFFs are streamed.")
+            layout = (int(page.photometric), page.samplesperpixel, tuple(int(e) for e in page.extrasamples))
+            if page.dtype != np.uint8 or layout not in _TIFF_MODES:
+                raise ValueError("Only 8-bit grayscale/RGB/RGBA TIFFs are streamed.")
+
+            self.mode = _TIFF_MODES[layout]
+            self.height, self.width = page.imagelength, page.imagewidth
+            self.seg_height = page.chunks[0]
+            self.seg_down, self.seg_across = page.chunked[0], page.chunked[1]
+
+            # Probe the codec once so a missing plugin falls back early.
+            self._decode_segment(tif, page, 0)
+
+    def _decode_segment(self, tif, page, index: int):
+        tif.filehandle.seek(page.dataoffsets[index])
+        data = tif.filehandle.read(page.databytecounts[index])
+        segment, indices, _ = page.decode(data, index)
+        # segment is (depth, rows, cols, samples); indices end with (y, x, sample)
+        return segment[0], indices[-3], indices[-2]
+
+    def read(self, y0: int, y1: int) -> Image.Image:
+        import tifffile
+
+        np = self._np
+        samples = 1 if self.mode == "L" else len(self.mode)
+        band = np.empty((y1 - y0, self.width, samples), dtype=np.uint8)
+
+        with tifffile.TiffFile(self.path) as tif:
+            page = tif.pages[0]
+            first, last = y0 // self.seg_height, (y1 - 1) // self.seg_height
+
+            for seg_row in range(first, min(last, self.seg_down - 1) + 1):
+                for seg_col in range(self.seg_across):
+                    segment, sy, sx = self._decode_segment(
+                        tif, page, seg_row * self.seg_across + seg_col
+                    )
+                    # Edge tiles are padded; clip to the image and the band.
+                    a, b = max(y0, sy), min(y1, sy + segment.shape[0], self.height)
+                    w = min(segment.shape[1], self.width - sx)
+                    band[a - y0:b - y0, sx:sx + w] = segment[a - sy:b - sy, :w]
+
+        if samples == 1:
+            band = band[:, :, 0]
+        return Image.fromarray(band, self.mode)
+
+
+class _FullDecodeBandReader:
+    """
+    Fallback for formats without row access: decode once, crop bands.
+    """
+    name = "full"
+
+    def __init__(self, image: Image.Image):
+        self.image = image
+
+    def read(self, y0: int, y1: int) -> Image.Image:
+        return self.image.crop((0, y0, self.image.width, y1))
+
+
+class StreamingImageSlicer(ImageSlicer):
+    """
+    ImageSlicer that decodes one slice row at a time.
+
+    Slices come out in the same order, with the same boxes and pixels, as
+    ImageSlicer. `streaming` is False when the format forced a full decode.
+    Horizontal mode has a single slice row, so it cannot save memory there.
+    """
+
+    def __init__(self, image_path: str):
+        source = Image.open(image_path)  # header only; pixels stay on disk
+        self.width, self.height = source.size
+        self.info = source.info
+        self.image_path = image_path
+        self._reader = self._select_reader(image_path, source)
+        self.streaming = self._reader.name != "full"
+
+    @property
+    def reader_name(self) -> str:
+        return self._reader.name
+
+    @staticmethod
+    def _select_reader(path: str, source: Image.Image):
+        try:
+            return _RawBandReader(path, source)
+        except ValueError:
+            pass
+
+        if source.format == "TIFF":
+            try:
+                return _TiffSegmentBandReader(path)
+            except Exception:
+                # tifffile / codec plugin missing or layout not supported
+                pass
+
+        return _FullDecodeBandReader(source)
+
+    def read_band(self, y0: int, y1: int) -> Image.Image:
+        """
+        Decode rows [y0, y1) at full width.
+        """
+        if not 0 <= y0 < y1 <= self.height:
+            raise ValueError(f"Band rows out of range: {y0}-{y1}")
+        return self._reader.read(y0, y1)
+
+    def iter_plan(self, plan: SlicePlan) -> Iterator[ImageSlice]:
+        if (plan.width, plan.height) != (self.width, self.height):
+            raise ValueError("Slice plan geometry does not match image size.")
+
+        # Plans are row-major, so each band serves a contiguous run of boxes.
+        # Overlapping window rows re-read their shared rows; boxes padded
+        # past the bottom edge read up to it and crop() zero-fills the rest.
+        for (y0, y1), run in groupby(plan, key=lambda item: (item[1][1], item[1][3])):
+            band = self.read_band(y0, min(y1, self.height))
+            for index, box in run:
+                x0, _, x1, _ = box
+                yield ImageSlice(band.crop((x0, 0, x1, y1 - y0)), index, box)
+            del band  # release before decoding the next row
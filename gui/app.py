@@ -1,15 +1,15 @@
 import os
 import threading
-import subprocess
 import shutil
-import time
 import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog
 from PIL import Image, ImageTk
 from typing import Any, Optional
 
 from batch import BatchImageProcessor
-from core import ImageSlicer
+from batch.discovery import first_image_file
+from batch.processor import SUPPORTED_EXTENSIONS
+from core import get_slice_plan
 
 PREVIEW_SIZE = (420, 260)
 
@@ -38,7 +38,6 @@ class PixelForgeGUI:
         # Extraction worker state
         self._extract_thread: Optional[threading.Thread] = None
         self._extract_cancel = threading.Event()
-        self._extract_process: Optional[subprocess.Popen] = None
         self._extract_count_var = tk.StringVar(value="Frames: 0")
 
         self._build_ui()
@@ -101,7 +100,7 @@ class PixelForgeGUI:
 
         self.smart_check = tk.Checkbutton(
             control_frame,
-            text="Smart slicing (horizontal only)",
+            text="Smart slicing",
             variable=self.smart
         )
         self.smart_check.grid(row=3, column=0, columnspan=3, sticky="w")
@@ -173,7 +172,6 @@ class PixelForgeGUI:
         self.n_entry.config(state="normal" if mode in ("horizontal", "vertical") else "disabled")
         self.rows_entry.config(state="normal" if mode == "grid" else "disabled")
         self.cols_entry.config(state="normal" if mode == "grid" else "disabled")
-        self.smart_check.config(state="normal" if mode == "horizontal" else "disabled")
 
     # ---------------- Preview ----------------
 
@@ -190,14 +188,12 @@ class PixelForgeGUI:
 
     def load_preview_image(self) -> None:
         try:
-            images = [
-                f for f in os.listdir(self.input_dir.get() or ".")
-                if f.lower().endswith((".png", ".jpg", ".jpeg", ".webp", ".tiff"))
-            ]
-            if not images:
+            # Stops at the first image instead of listing the whole folder.
+            first = first_image_file(self.input_dir.get() or ".", SUPPORTED_EXTENSIONS)
+            if first is None:
                 raise ValueError("No images found in folder")
 
-            self.image_path = os.path.join(self.input_dir.get(), images[0])
+            self.image_path = os.path.join(self.input_dir.get(), first)
             self.original_image = Image.open(self.image_path)
             self.status.set("Preview loaded")
             self.update_preview()
@@ -222,51 +218,32 @@ class PixelForgeGUI:
         )
 
         try:
-            slicer = ImageSlicer.__new__(ImageSlicer)
-            slicer.width, slicer.height = self.original_image.size
+            width, height = self.original_image.size
 
-            scale_x = img.width / slicer.width
-            scale_y = img.height / slicer.height
+            scale_x = img.width / width
+            scale_y = img.height / height
 
             # Smart overlay (horizontal only) - draw first so deterministic lines sit on top
             if self.smart.get() and self.mode.get() == "horizontal" and self.n.get():
                 self.draw_smart_overlay(img, scale_x)
 
-            if self.mode.get() == "horizontal" and self.n.get():
-                widths = slicer.compute_segments(slicer.width, int(self.n.get()))
-                x = 0
-                for w in widths[:-1]:
-                    x += w
-                    self.preview_canvas.create_line(
-                        x * scale_x, 0, x * scale_x, img.height,
-                        fill="white", width=2
-                    )
-
-            elif self.mode.get() == "vertical" and self.n.get():
-                heights = slicer.compute_segments(slicer.height, int(self.n.get()))
-                y = 0
-                for h in heights[:-1]:
-                    y += h
-                    self.preview_canvas.create_line(
-                        0, y * scale_y, img.width, y * scale_y,
-                        fill="white", width=2
-                    )
-
+            plan = None
+            if self.mode.get() in ("horizontal", "vertical") and self.n.get():
+                plan = get_slice_plan(width, height, self.mode.get(), n=int(self.n.get()))
             elif self.mode.get() == "grid" and self.rows.get() and self.cols.get():
-                widths = slicer.compute_segments(slicer.width, int(self.cols.get()))
-                heights = slicer.compute_segments(slicer.height, int(self.rows.get()))
+                plan = get_slice_plan(
+                    width, height, "grid",
+                    rows=int(self.rows.get()), cols=int(self.cols.get())
+                )
 
-                x = 0
-                for w in widths[:-1]:
-                    x += w
+            # Interior cut lines come straight from the cached plan edges
+            if plan is not None:
+                for x in plan.x_edges[1:-1].tolist():
                     self.preview_canvas.create_line(
                         x * scale_x, 0, x * scale_x, img.height,
                         fill="white", width=2
                     )
-
-                y = 0
-                for h in heights[:-1]:
-                    y += h
+                for y in plan.y_edges[1:-1].tolist():
                     self.preview_canvas.create_line(
                         0, y * scale_y, img.width, y * scale_y,
                         fill="white", width=2
@@ -281,30 +258,32 @@ class PixelForgeGUI:
         """
         Draws an adaptive smart slicing heatmap + candidate markers.
         Uses local imports for OpenCV and numpy to avoid top-level unused-import warnings.
+        The column energy comes from the smart splitter's shared energy cache.
         The drawing samples image columns into canvas columns for efficiency.
         """
         try:
-            import cv2  # local import
             import numpy as np  # local import
+            from core.decoded import DecodedImage  # local import
+            from smart.smart_splitter import SmartVerticalSplitter  # local import (needs OpenCV)
         except Exception:
             # OpenCV / numpy not available; skip overlay silently
             return
 
-        if not self.image_path:
+        if not self.image_path or not self.original_image:
             return
 
-        cv_img = cv2.imread(self.image_path)
-        if cv_img is None:
+        try:
+            # Served from the shared energy cache: changing n, mode or the
+            # preview size reuses the profile, and so does a later batch run.
+            splitter = SmartVerticalSplitter(
+                decoded=DecodedImage.from_image(self.image_path, self.original_image)
+            )
+            energy = splitter.column_energy()
+        except Exception:
             return
 
-        gray = cv2.cvtColor(cv_img, cv2.COLOR_BGR2GRAY)
-        edges = cv2.Canny(gray, 50, 150)
-
-        # Column-wise edge energy
-        energy = np.sum(edges, axis=0).astype(float)
         if energy.size == 0:
             return
-        energy /= energy.max() + 1e-6
 
         width = self.original_image.width
         preview_w = preview_img.width
@@ -412,156 +391,40 @@ class PixelForgeGUI:
 
     def cancel_extraction(self) -> None:
         """
-        Request extraction cancellation; this will kill ffmpeg subprocess or stop OpenCV loop.
+        Request extraction cancellation; the extractor stops ffmpeg or the OpenCV loop.
         """
         if self._extract_thread and self._extract_thread.is_alive():
             self._extract_cancel.set()
-            # kill ffmpeg if running
-            if self._extract_process:
-                try:
-                    self._extract_process.kill()
-                except Exception:
-                    pass
             self.status.set("Extraction cancellation requested")
         else:
             self.status.set("No active extraction to cancel")
 
     def _extract_worker(self, video_path: str, outdir: str, fmt: str, backend: str) -> None:
         """
-        Worker that runs in a background thread. For ffmpeg we spawn a subprocess and
-        monitor the output directory to show extracted frame count. For OpenCV we perform
-        frame-by-frame extraction and update the counter each frame. Support cancellation.
+        Worker that runs in a background thread. Extraction reports the frames
+        written so far (ffmpeg -progress or the OpenCV write loop) to the
+        counter and stops when the cancel event is set.
         """
-        try:
-            os.makedirs(outdir, exist_ok=True)
-            prefix = "frame"
-
-            # Remove previous frames from outdir that match the pattern? We leave them to avoid data loss.
-            # Instead, we count only matching files created during this run by tracking initial set.
-            initial_files = set(f for f in os.listdir(outdir) if f.lower().endswith("." + fmt.lower()) and f.startswith(prefix + "_"))
-
-            if backend == "ffmpeg" and self._ffmpeg_available():
-                # Run ffmpeg with progress to stdout and monitor created files
-                out_pattern = os.path.join(outdir, f"{prefix}_%06d.{fmt}")
-                cmd = ["ffmpeg", "-hide_banner", "-progress", "-", "-i", video_path, "-vsync", "0", "-y", out_pattern]
-
-                # spawn
-                self._extract_process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    universal_newlines=True
-                )
-
-                # While ffmpeg runs, poll the output directory for new frames and handle cancel
-                last_count = 0
-                while True:
-                    if self._extract_cancel.is_set():
-                        # kill process and exit
-                        try:
-                            if self._extract_process:
-                                self._extract_process.kill()
-                        except Exception:
-                            pass
-                        break
-
-                    # non-blocking check if process has ended
-                    retcode = self._extract_process.poll()
-                    # count new files
-                    cur_files = [f for f in os.listdir(outdir) if f.startswith(prefix + "_") and f.lower().endswith("." + fmt.lower())]
-                    cur_count = len([f for f in cur_files if f not in initial_files])
-                    if cur_count != last_count:
-                        last_count = cur_count
-                        # schedule UI update on main thread
-                        self.root.after(0, lambda c=cur_count: self._extract_count_var.set(f"Frames: {c}"))
-
-                    if retcode is not None:
-                        # process finished
-                        break
-
-                    # small sleep to avoid busy loop
-                    time.sleep(0.2)
-
-                # after exit, read returncode and stderr for errors
-                if self._extract_cancel.is_set():
-                    self.root.after(0, lambda: self.status.set("Extraction canceled"))
-                    self._extract_process = None
-                    return
-
-                ret = self._extract_process.wait()
-                stderr = self._extract_process.stderr.read() if self._extract_process.stderr else ""
-                self._extract_process = None
-
-                if ret != 0:
-                    # ffmpeg failed; surface error
-                    self.root.after(0, lambda: self.status.set("Extraction failed"))
-                    self.root.after(0, lambda: messagebox.showerror("Extraction error", f"ffmpeg failed:\n{stderr}"))
-                    return
-
-                # final count
-                final_files = [f for f in os.listdir(outdir) if f.startswith(prefix + "_") and f.lower().endswith("." + fmt.lower())]
-                final_count = len([f for f in final_files if f not in initial_files])
-                self.root.after(0, lambda: self._extract_count_var.set(f"Frames: {final_count}"))
-                self.root.after(0, lambda: self.status.set(f"Extracted {final_count} frames (ffmpeg)"))
-                return
-
-            # Fallback: OpenCV extraction implemented inline so we can report progress and cancel
-            try:
-                import cv2
-            except Exception as e:
-                self.root.after(0, lambda: messagebox.showerror("Extraction error", "OpenCV not installed and ffmpeg not available."))
-                self.root.after(0, lambda: self.status.set("Extraction failed"))
-                return
-
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                self.root.after(0, lambda: messagebox.showerror("Extraction error", f"Failed to open video: {video_path}"))
-                self.root.after(0, lambda: self.status.set("Extraction failed"))
-                return
+        from tools.video_extractor import extract_frames  # local import
 
-            idx = 0
-            written = 0
-            while True:
-                if self._extract_cancel.is_set():
-                    break
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                idx += 1
-                out_name = f"{prefix}_{idx:06d}.{fmt}"
-                out_path = os.path.join(outdir, out_name)
-
-                # write with best available params
-                if fmt.lower() in ("jpg", "jpeg"):
-                    ok = cv2.imwrite(out_path, frame, [int(cv2.IMWRITE_JPEG_QUALITY), 100])
-                elif fmt.lower() == "png":
-                    ok = cv2.imwrite(out_path, frame, [int(cv2.IMWRITE_PNG_COMPRESSION), 0])
-                else:
-                    ok = cv2.imwrite(out_path, frame)
-
-                if not ok:
-                    cap.release()
-                    self.root.after(0, lambda: messagebox.showerror("Extraction error", f"Failed to write frame {out_path}"))
-                    self.root.after(0, lambda: self.status.set("Extraction failed"))
-                    return
-
-                written += 1
-                # update UI
-                if written % 1 == 0:
-                    self.root.after(0, lambda c=written: self._extract_count_var.set(f"Frames: {c}"))
-                # small sleep to be cooperative
-                time.sleep(0.001)
-
-            cap.release()
-            if self._extract_cancel.is_set():
-                self.root.after(0, lambda: self.status.set("Extraction canceled"))
-            else:
-                self.root.after(0, lambda: self.status.set(f"Extracted {written} frames (opencv)"))
-            self.root.after(0, lambda w=written: self._extract_count_var.set(f"Frames: {w}"))
+        def _progress(count: int) -> None:
+            self.root.after(0, lambda c=count: self._extract_count_var.set(f"Frames: {c}"))
 
+        try:
+            backend_used, written = extract_frames(
+                video_path, outdir, fmt=fmt, prefix="frame", backend=backend, overwrite=True,
+                progress=_progress, cancel=self._extract_cancel
+            )
         except Exception as exc:
-            self.root.after(0, lambda: messagebox.showerror("Extraction error", str(exc)))
+            self.root.after(0, lambda e=exc: messagebox.showerror("Extraction error", str(e)))
             self.root.after(0, lambda: self.status.set("Extraction failed"))
+            return
+
+        _progress(written)
+        if self._extract_cancel.is_set():
+            self.root.after(0, lambda: self.status.set("Extraction canceled"))
+        else:
+            self.root.after(0, lambda: self.status.set(f"Extracted {written} frames ({backend_used})"))
 
     # ---------------- Batch ----------------
 
@@ -1,3 +1,5 @@
-from .smart_splitter import SmartVerticalSplitter
+from .smart_splitter import SmartSplitter, SmartVerticalSplitter, SPLIT_STRATEGIES
+from .energy import ENERGY_FUNCTIONS, ENERGY_NAMES, register_energy
+from .energy_cache import EnergyCache, shared_energy_cache
 
-__all__ = ["SmartVerticalSplitter"]
+__all__ = ["SmartSplitter", "SmartVerticalSplitter", "SPLIT_STRATEGIES", "ENERGY_FUNCTIONS", "ENERGY_NAMES", "register_energy", "EnergyCache", "shared_energy_cache"]
@@ -0,0 +1,157 @@
+"""
+Cache of 1-D energy profiles, shared by the GUI preview and batch runs.
+
+Profiles are keyed by the image file plus the energy parameters. Entries
+live in an in-memory LRU and, optionally, as small .npy files in a cache
+directory that separate processes (batch workers, later runs) share. The
+disk layer identifies files by content hash, so renamed or copied files
+still hit and edited files miss; the memory-only cache uses path, size
+and mtime instead, so files are never read just to be hashed.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_MAXSIZE = 256
+
+_digest_memo: Dict[Tuple[str, int, int], str] = {}
+_digest_lock = threading.Lock()
+
+
+def file_digest(path: str) -> str:
+    """
+    Content hash of a file (BLAKE2b-128, hex).
+
+    Memoised on (path, size, mtime) so repeated lookups for an unchanged
+    file do not re-read it.
+    """
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+    with _digest_lock:
+        digest = _digest_memo.get(memo_key)
+    if digest is not None:
+        return digest
+
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+
+    with _digest_lock:
+        _digest_memo[memo_key] = digest
+    return digest
+
+
+class EnergyCache:
+    """
+    LRU cache of energy profiles with an optional on-disk .npy layer.
+    Safe to share between threads.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, disk_dir: Optional[str] = None):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive.")
+
+        self.maxsize = maxsize
+        self.disk_dir = disk_dir
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def file_key(self, path: str) -> str:
+        """
+        Identity of an image file for make_key: its content digest with a
+        disk layer, else its path, size and mtime.
+        """
+        if self.disk_dir:
+            return file_digest(path)
+        stat = os.stat(path)
+        return f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+    @staticmethod
+    def make_key(file_key: str, params: Tuple) -> str:
+        """
+        Cache key (and sidecar file stem, with a disk layer) for a file key
+        and energy parameters.
+        """
+        return file_key + "_" + "-".join(str(p) for p in params)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key + ".npy")
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            profile = self._entries.get(key)
+            if profile is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return profile
+
+        if self.disk_dir and os.path.isfile(self._disk_path(key)):
+            try:
+                profile = np.load(self._disk_path(key))
+            except (OSError, ValueError):
+                profile = None  # torn or foreign file: recompute
+            if profile is not None:
+                self._remember(key, profile)
+                with self._lock:
+                    self.hits += 1
+                return profile
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, profile: np.ndarray):
+        profile = np.ascontiguousarray(profile)
+        profile.flags.writeable = False
+        self._remember(key, profile)
+
+        if self.disk_dir:
+            # Write then rename so concurrent readers never see a partial file.
+            tmp_path = self._disk_path(key) + f".{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, profile)
+            os.replace(tmp_path, self._disk_path(key))
+
+    def _remember(self, key: str, profile: np.ndarray):
+        with self._lock:
+            self._entries[key] = profile
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Drop in-memory entries (sidecar files are kept).
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+_shared: Dict[Optional[str], EnergyCache] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_energy_cache(disk_dir: Optional[str] = None) -> EnergyCache:
+    """
+    Process-wide cache for a given disk directory (None = memory only).
+    The GUI and batch runs started from it use the same instance.
+    """
+    with _shared_lock:
+        cache = _shared.get(disk_dir)
+        if cache is None:
+            cache = _shared[disk_dir] = EnergyCache(disk_dir=disk_dir)
+        return cache
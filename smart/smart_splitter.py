@@ -1,80 +1,419 @@
 import cv2
 import numpy as np
 from PIL import Image
-from typing import List
+import os
+from typing import List, Optional, Tuple, Union
+from core.decoded import DecodedImage
+from core.plan import SlicePlan
+from smart.energy import EnergyFunction, get_energy
+from smart.energy_cache import EnergyCache, shared_energy_cache
+
+SPLIT_STRATEGIES = ("greedy", "dp")
+
+# Analysis downscale factor -> OpenCV flag that decodes straight to reduced gray
+ANALYSIS_REDUCTIONS = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+
+def select_cuts_greedy(energy: np.ndarray, n: int, min_gap: int) -> List[int]:
+    """
+    Original greedy selection: walk columns from lowest energy upwards and
+    keep each one that is at least min_gap away from the cuts kept so far.
+
+    Fast to reason about, but it can miss a valid cut set and does not
+    minimise the total energy of the cuts.
+    """
+    width = len(energy)
+    sorted_indices = np.argsort(energy)
+
+    split_positions = []
+
+    for idx in sorted_indices:
+        if idx < min_gap or idx > width - min_gap:
+            continue
+
+        if all(abs(idx - s) >= min_gap for s in split_positions):
+            split_positions.append(int(idx))
+
+        if len(split_positions) == n - 1:
+            break
+
+    if len(split_positions) < n - 1:
+        raise RuntimeError("Unable to find enough smart split positions.")
+
+    split_positions.sort()
+    return split_positions
+
+
+def select_cuts_dp(energy: np.ndarray, n: int, min_gap: int) -> List[int]:
+    """
+    Pick n-1 cuts minimising their summed energy, with every cut (and both
+    image edges) at least min_gap apart.
+
+    Dynamic programme over cut count: best[k][x] is the cheapest way to place
+    k+1 cuts with the last one at column x. Each step is a vectorised prefix
+    minimum, so the cost is O(n * width) in NumPy rather than Python.
+    """
+    width = len(energy)
+    cuts = n - 1
+    lo, hi = min_gap, width - min_gap  # allowed cut columns, inclusive
+
+    if cuts <= 0 or hi - lo < (cuts - 1) * min_gap:
+        raise RuntimeError("Unable to find enough smart split positions.")
+
+    columns = np.arange(width)
+    allowed = (columns >= lo) & (columns <= hi)
+    cost = np.where(allowed, energy.astype(np.float64), np.inf)
+    back = np.empty((cuts, width), dtype=np.int32)
+    back[0] = -1
+
+    for k in range(1, cuts):
+        # Cheapest previous placement ending at or before x - min_gap.
+        prefix = np.minimum.accumulate(cost)
+        arg = np.maximum.accumulate(np.where(cost == prefix, columns, 0))
+
+        prev_cost = np.full(width, np.inf)
+        prev_arg = np.zeros(width, dtype=np.int32)
+        prev_cost[min_gap:] = prefix[:-min_gap]
+        prev_arg[min_gap:] = arg[:-min_gap]
+
+        cost = np.where(allowed, energy + prev_cost, np.inf)
+        back[k] = prev_arg
+
+    last = int(np.argmin(cost))
+    if not np.isfinite(cost[last]):
+        raise RuntimeError("Unable to find enough smart split positions.")
+
+    positions = [last]
+    for k in range(cuts - 1, 0, -1):
+        positions.append(int(back[k][positions[-1]]))
+
+    positions.reverse()
+    return positions
+
+
+def _to_gray(image: Image.Image) -> np.ndarray:
+    """
+    8-bit grayscale array of a PIL image, using OpenCV's luma weights.
+    """
+    if image.mode == "L":
+        return np.asarray(image)
+    rgb = image if image.mode == "RGB" else image.convert("RGB")
+    return cv2.cvtColor(np.asarray(rgb), cv2.COLOR_RGB2GRAY)
+
+
+def _expand(profile: np.ndarray, size: int, reduce: int) -> np.ndarray:
+    """
+    Stretch a reduced-resolution profile to one value per full-resolution pixel.
+    """
+    if reduce == 1:
+        return profile
+    # Each reduced column/row stands for `reduce` full-resolution ones.
+    index = np.minimum(np.arange(size) // reduce, len(profile) - 1)
+    return profile[index]
 
 
 class SmartVerticalSplitter:
     """
     Content-aware vertical image splitter using OpenCV.
+
+    Pixels come from a shared DecodedImage handle: the energy analysis reads
+    a grayscale buffer (optionally decoded at 1/2, 1/4 or 1/8 resolution)
+    and the slices are cropped from the handle's decoded image, so callers
+    falling back to ImageSlicer can reuse the same decode.
     """
 
-    def __init__(self, image_path: str):
-        self.image_path = image_path
-        self.cv_image = cv2.imread(image_path)
+    def __init__(
+        self,
+        image_path: str = None,
+        decoded: DecodedImage = None,
+        reduce: int = 1,
+        energy_cache: Union[EnergyCache, bool, None] = True,
+        energy: str = "canny"
+    ):
+        if decoded is None:
+            if image_path is None:
+                raise ValueError("SmartVerticalSplitter needs image_path or decoded.")
+            try:
+                decoded = DecodedImage(image_path)
+            except Exception as e:
+                raise ValueError("Failed to load image.") from e
+        if reduce not in ANALYSIS_REDUCTIONS:
+            raise ValueError(f"reduce must be one of {sorted(ANALYSIS_REDUCTIONS)}")
+
+        self.decoded = decoded
+        self.image_path = decoded.path
+        self.reduce = reduce
+        self.energy: EnergyFunction = get_energy(energy)
+        self.width, self.height = decoded.size
+
+        # True -> process-wide memory cache; None/False -> always recompute.
+        if energy_cache is True:
+            energy_cache = shared_energy_cache()
+        self.energy_cache: Optional[EnergyCache] = energy_cache or None
+        self._file_key: Optional[str] = None
+        self._profiles = {}  # reduce -> (cols, rows), for this instance
+
+    @property
+    def cv_image(self) -> np.ndarray:
+        """
+        BGR view of the decoded image, for OpenCV callers.
+        """
+        return cv2.cvtColor(np.asarray(self.decoded.image.convert("RGB")), cv2.COLOR_RGB2BGR)
+
+    def gray(self, reduce: int = None) -> np.ndarray:
+        """
+        Grayscale analysis buffer at 1/reduce resolution (default: self.reduce).
+
+        Reduced reads use cv2.IMREAD_REDUCED_GRAYSCALE_* straight from the file
+        (JPEG decodes at the lower scale) unless the full image is already
+        decoded, in which case it is converted and downsampled in memory.
+        """
+        reduce = reduce or self.reduce
+        if reduce > 1 and not self.decoded.is_decoded:
+            gray = cv2.imread(self.image_path, ANALYSIS_REDUCTIONS[reduce])
+            if gray is not None:
+                return gray
 
-        if self.cv_image is None:
-            raise ValueError("Failed to load image with OpenCV.")
+        gray = _to_gray(self.decoded.image)
 
-        self.height, self.width = self.cv_image.shape[:2]
+        if reduce > 1:
+            size = (-(-self.width // reduce), -(-self.height // reduce))
+            gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+        return gray
 
-    def find_split_positions(self, n: int) -> List[int]:
+    def _cache_key(self, params: Tuple) -> Optional[str]:
+        """
+        Energy-cache key for this file, or None when caching does not apply.
+        """
+        if self.energy_cache is None or self.image_path is None or not os.path.isfile(self.image_path):
+            return None
+        if self._file_key is None:
+            self._file_key = self.energy_cache.file_key(self.image_path)
+        return self.energy_cache.make_key(self._file_key, params)
+
+    def native_profiles(self, reduce: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Normalised (column, row) energy at the analysis resolution, both
+        taken from a single pass of the energy function and stored in the
+        energy cache.
+        """
+        reduce = reduce or self.reduce
+        if reduce in self._profiles:
+            return self._profiles[reduce]
+
+        col_key = self._cache_key(self.energy.cache_params(f"r{reduce}"))
+        row_key = self._cache_key(self.energy.cache_params(f"r{reduce}", "rows"))
+        if col_key is not None:
+            cols, rows = self.energy_cache.get(col_key), self.energy_cache.get(row_key)
+            if cols is not None and rows is not None:
+                self._profiles[reduce] = (cols, rows)
+                return cols, rows
+
+        cols, rows = self.energy(self.gray(reduce))
+
+        # Normalize for stability
+        cols /= cols.max() + 1e-6
+        rows /= rows.max() + 1e-6
+
+        if col_key is not None:
+            self.energy_cache.put(col_key, cols)
+            self.energy_cache.put(row_key, rows)
+        self._profiles[reduce] = (cols, rows)
+        return cols, rows
+
+    def native_energy(self, reduce: int = None) -> np.ndarray:
+        """
+        Normalised column energy at the analysis resolution (one value per
+        reduced column), served from the energy cache when possible.
+        """
+        reduce = reduce or self.reduce
+        if reduce in self._profiles:
+            return self._profiles[reduce][0]
+
+        key = self._cache_key(self.energy.cache_params(f"r{reduce}"))
+        if key is not None:
+            cached = self.energy_cache.get(key)
+            if cached is not None:
+                return cached
+        return self.native_profiles(reduce)[0]
+
+    def column_energy(self, reduce: int = None) -> np.ndarray:
+        """
+        Normalised column-wise energy (0..1, low = quiet column),
+        one value per full-resolution column.
+        """
+        reduce = reduce or self.reduce
+        return _expand(self.native_energy(reduce), self.width, reduce)
+
+    def row_energy(self, reduce: int = None) -> np.ndarray:
+        """
+        Normalised row-wise energy, one value per full-resolution row.
+        """
+        reduce = reduce or self.reduce
+        return _expand(self.native_profiles(reduce)[1], self.height, reduce)
+
+    def find_split_positions(
+        self,
+        n: int,
+        strategy: str = "greedy",
+        multiscale: bool = False,
+        coarse: int = 4,
+        tolerance: int = None
+    ) -> List[int]:
         """
         Find n-1 smart vertical split positions.
+
+        strategy: "greedy" (original lowest-energy-first pass) or "dp"
+        (minimum summed energy under the same min-gap constraint).
+
+        multiscale: choose cuts on a 1/coarse resolution energy profile,
+        then refine each one at full resolution within +/- tolerance
+        pixels (default: coarse). Only those column windows go through
+        the full-resolution energy function.
+        """
+        return self._find_cuts("x", n, strategy, multiscale, coarse, tolerance)
+
+    def _find_cuts(
+        self, axis: str, n: int, strategy: str, multiscale: bool, coarse: int, tolerance: Optional[int]
+    ) -> List[int]:
         """
+        Shared cut search: axis "x" cuts columns, axis "y" cuts rows.
+        """
+        size = self.width if axis == "x" else self.height
+
         if n <= 1:
             raise ValueError("n must be greater than 1 for smart splitting.")
-        if n > self.width:
-            raise ValueError("n exceeds image width.")
+        if n > size:
+            raise ValueError(f"n exceeds image {'width' if axis == 'x' else 'height'}.")
+        if strategy not in SPLIT_STRATEGIES:
+            raise ValueError(f"Unknown smart split strategy: {strategy}")
+        if multiscale and coarse not in ANALYSIS_REDUCTIONS:
+            raise ValueError(f"coarse must be one of {sorted(ANALYSIS_REDUCTIONS)}")
 
-        gray = cv2.cvtColor(self.cv_image, cv2.COLOR_BGR2GRAY)
-        edges = cv2.Canny(gray, threshold1=50, threshold2=150)
+        # We want LOW-energy columns/rows (less visual content)
+        reduce = coarse if multiscale else None
+        energy = self.column_energy(reduce) if axis == "x" else self.row_energy(reduce)
+        min_gap = size // n
 
-        # Sum edge strength column-wise
-        column_energy = np.sum(edges, axis=0)
+        if strategy == "dp":
+            positions = select_cuts_dp(energy, n, min_gap)
+        else:
+            positions = select_cuts_greedy(energy, n, min_gap)
 
-        # Normalize for stability
-        column_energy = column_energy.astype(np.float32)
-        column_energy /= column_energy.max() + 1e-6
+        if multiscale:
+            positions = self._refine_positions(
+                positions, min_gap, coarse, coarse if tolerance is None else tolerance, axis
+            )
+        return positions
 
-        # We want LOW-energy columns (less visual content)
-        sorted_indices = np.argsort(column_energy)
-
-        split_positions = []
-        min_gap = self.width // n
+    def _refine_positions(
+        self, positions: List[int], min_gap: int, coarse: int, tolerance: int, axis: str = "x"
+    ) -> List[int]:
+        """
+        Move each coarse cut to the quietest full-resolution column (or row) nearby.
 
-        for idx in sorted_indices:
-            if idx < min_gap or idx > self.width - min_gap:
-                continue
+        Windows are clamped so refined cuts keep the min-gap constraint:
+        each window still contains its coarse cut, which already satisfies it.
+        """
+        refined: List[int] = []
+        pad = self.energy.pad  # context the energy function needs around a cut
+        image = self.decoded.image
+        size = self.width if axis == "x" else self.height
 
-            if all(abs(idx - s) >= min_gap for s in split_positions):
-                split_positions.append(idx)
+        for i, pos in enumerate(positions):
+            lo = max(pos - tolerance, min_gap, refined[-1] + min_gap if refined else 0)
+            hi = min(pos + coarse - 1 + tolerance, size - min_gap)
+            if i + 1 < len(positions):
+                hi = min(hi, positions[i + 1] - min_gap)
 
-            if len(split_positions) == n - 1:
-                break
+            a, b = max(0, lo - pad), min(size, hi + 1 + pad)
+            if axis == "x":
+                energy = self.energy(_to_gray(image.crop((a, 0, b, self.height))))[0]
+            else:
+                energy = self.energy(_to_gray(image.crop((0, a, self.width, b))))[1]
+            window = energy[lo - a:hi + 1 - a]
+            refined.append(lo + int(np.argmin(window)))
 
-        if len(split_positions) < n - 1:
-            raise RuntimeError("Unable to find enough smart split positions.")
+        return refined
 
-        split_positions.sort()
-        return split_positions
+    def split_boxes(self, split_positions: List[int]) -> List[Tuple[int, int, int, int]]:
+        """
+        Crop boxes for the given split positions, left to right.
+        """
+        bounds = [0] + list(split_positions) + [self.width]
+        return [(bounds[i], 0, bounds[i + 1], self.height) for i in range(len(bounds) - 1)]
 
-    def split(self, n: int) -> List[Image.Image]:
+    def split(self, n: int, strategy: str = "greedy", **search) -> List[Image.Image]:
         """
         Perform smart vertical slicing.
+        Extra keyword arguments (multiscale, coarse, tolerance) go to find_split_positions.
         """
-        split_positions = self.find_split_positions(n)
+        split_positions = self.find_split_positions(n, strategy=strategy, **search)
 
-        pil_image = Image.open(self.image_path)
-        slices = []
+        image = self.decoded.image
+        return [image.crop(box) for box in self.split_boxes(split_positions)]
 
-        prev_x = 0
-        index = 1
 
-        for x in split_positions + [self.width]:
-            box = (prev_x, 0, x, self.height)
-            slices.append(pil_image.crop(box))
-            prev_x = x
-            index += 1
+class SmartSplitter(SmartVerticalSplitter):
+    """
+    Content-aware splitter for every slicing mode.
+
+    Column and row energy come from the same energy pass, so grid jobs pay
+    for one analysis. Cuts are returned as a SlicePlan that ImageSlicer
+    can crop from the shared decoded image.
+    """
+
+    def find_row_positions(self, n: int, strategy: str = "greedy", **search) -> List[int]:
+        """
+        Find n-1 smart horizontal cut positions (for vertical/grid modes).
+        """
+        return self._find_cuts(
+            "y", n, strategy,
+            search.get("multiscale", False), search.get("coarse", 4), search.get("tolerance")
+        )
+
+    def plan(
+        self,
+        mode: str,
+        n: int = None,
+        rows: int = None,
+        cols: int = None,
+        strategy: str = "greedy",
+        **search
+    ) -> SlicePlan:
+        """
+        Content-aware SlicePlan for the given mode.
+
+        horizontal: n column slices; vertical: n row slices;
+        grid: rows x cols. Raises if any axis has no valid cut set.
+        """
+        if mode == "horizontal":
+            if n is None:
+                raise ValueError("Horizontal slicing requires n.")
+            x_cuts = self.find_split_positions(n, strategy=strategy, **search)
+            y_cuts = []
+        elif mode == "vertical":
+            if n is None:
+                raise ValueError("Vertical slicing requires n.")
+            x_cuts = []
+            y_cuts = self.find_row_positions(n, strategy=strategy, **search)
+        elif mode == "grid":
+            if rows is None or cols is None:
+                raise ValueError("Grid slicing requires rows and cols.")
+            # Both axes read the profiles of one energy pass (memoised per splitter).
+            x_cuts = self.find_split_positions(cols, strategy=strategy, **search) if cols > 1 else []
+            y_cuts = self.find_row_positions(rows, strategy=strategy, **search) if rows > 1 else []
+        else:
+            raise ValueError(f"Unsupported slicing mode: {mode}")
 
-        return slices
+        return SlicePlan.from_edges(
+            self.width, self.height, mode,
+            [0] + x_cuts + [self.width],
+            [0] + y_cuts + [self.height],
+            n=n, rows=rows, cols=cols
+        )
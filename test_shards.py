@@ -0,0 +1,105 @@
+"""
+Crash-and-resume check for shard output: a run killed mid-shard must not
+leave inputs marked done whose tiles sit in an unreadable shard.
+
+    python test_shards.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import zipfile
+
+import numpy as np
+from PIL import Image
+
+from batch import BatchImageProcessor, ShardConfig
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Child run: slice with shards and die (no cleanup at all) after 3 inputs.
+CRASH_RUN = """
+import os, sys
+sys.path.insert(0, {root!r})
+import batch.processor as processor
+from batch import BatchImageProcessor, ShardConfig
+
+real_process_file = processor.process_file
+done = []
+
+def process_file(*args, **kwargs):
+    if len(done) == 3:
+        os._exit(1)
+    done.append(args[0])
+    return real_process_file(*args, **kwargs)
+
+processor.process_file = process_file
+BatchImageProcessor({input_dir!r}, {output_dir!r}, log_dir={log_dir!r}, quiet=True).process(
+    mode="grid", rows=2, cols=2, shards=ShardConfig({kind!r})
+)
+"""
+
+
+def make_inputs(input_dir: str, count: int = 5):
+    rng = np.random.default_rng(0)
+    for i in range(count):
+        pixels = rng.integers(0, 256, size=(240, 320, 3), dtype=np.uint8)
+        Image.fromarray(pixels).save(os.path.join(input_dir, f"img{i}.png"))
+
+
+def latest_index(output_dir: str) -> dict:
+    entries = {}
+    with open(os.path.join(output_dir, "shards", "index.jsonl"), encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            entries[entry["tile"]] = entry
+    return entries
+
+
+def check_readable(output_dir: str, kind: str):
+    entries = latest_index(output_dir)
+    assert len(entries) == 5 * 4, f"{kind}: {len(entries)} tiles indexed"
+
+    for tile, entry in entries.items():
+        path = os.path.join(output_dir, "shards", entry["shard"])
+        if kind == "npy":
+            rows = np.load(path, mmap_mode="r")
+            assert entry["row"] < rows.shape[0], f"npy: {tile} not in {entry['shard']} {rows.shape}"
+        elif kind == "zip":
+            with zipfile.ZipFile(path) as shard:
+                assert tile in shard.namelist(), f"zip: {tile} missing from {entry['shard']}"
+
+
+def run_crash_and_resume(kind: str):
+    with tempfile.TemporaryDirectory() as tmp:
+        input_dir, output_dir, log_dir = (os.path.join(tmp, d) for d in ("in", "out", "logs"))
+        os.makedirs(input_dir)
+        make_inputs(input_dir)
+
+        code = CRASH_RUN.format(root=ROOT, input_dir=input_dir, output_dir=output_dir, log_dir=log_dir, kind=kind)
+        crashed = subprocess.run([sys.executable, "-c", code])
+        assert crashed.returncode == 1, "the first run should have been killed"
+
+        result = BatchImageProcessor(input_dir, output_dir, log_dir=log_dir, quiet=True).process(
+            mode="grid", rows=2, cols=2, shards=ShardConfig(kind)
+        )
+        print(f"{kind}: resumed, processed {len(result.processed)}, skipped {len(result.skipped)}")
+        assert not result.failed
+        check_readable(output_dir, kind)
+
+        rerun = BatchImageProcessor(input_dir, output_dir, log_dir=log_dir, quiet=True).process(
+            mode="grid", rows=2, cols=2, shards=ShardConfig(kind)
+        )
+        assert len(rerun.skipped) == 5, f"{kind}: finished inputs should be skipped"
+
+
+def test_shard_crash_and_resume():
+    for kind in ("npy", "zip", "tar"):
+        run_crash_and_resume(kind)
+
+
+if __name__ == "__main__":
+    test_shard_crash_and_resume()
+    print("Shard crash-and-resume: OK")
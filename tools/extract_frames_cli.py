@@ -5,7 +5,9 @@ Robust CLI wrapper for tools/video_extractor.py
 Works whether run from project root or from tools/ directly.
 """
 import argparse
+import signal
 import sys
+import threading
 from pathlib import Path
 
 # Ensure project root is on sys.path so `tools` package can be imported.
@@ -16,7 +18,8 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 # Now safe to import
-from tools.video_extractor import extract_frames, check_ffmpeg  # type: ignore
+from tools.video_extractor import FrameSampling, extract_frames, check_ffmpeg  # type: ignore
+from core.encoding import ENCODER_PROFILES  # type: ignore
 
 def main():
     p = argparse.ArgumentParser(description="Extract frames from video (Pixi Forge helper).")
@@ -28,12 +31,31 @@ def main():
     p.add_argument("--start", type=float, default=None, help="Start time in seconds")
     p.add_argument("--duration", type=float, default=None, help="Duration in seconds")
     p.add_argument("--overwrite", action="store_true", help="Overwrite existing frames")
+    p.add_argument("--profile", choices=ENCODER_PROFILES, default=None,
+                   help="Encoder profile: fastest, balanced or smallest (default: backend defaults)")
+    p.add_argument("--workers", type=int, default=1,
+                   help="Split the video into this many time segments extracted in parallel (default: 1)")
+    p.add_argument("--quiet", action="store_true", help="Do not print the running frame count")
+    sample = p.add_mutually_exclusive_group()
+    sample.add_argument("--every", type=int, default=None, help="Extract every Nth frame")
+    sample.add_argument("--fps", type=float, default=None, help="Extract at this many frames per second")
+    sample.add_argument("--keyframes", action="store_true", help="Extract key frames only (non-key frames are not decoded)")
+    sample.add_argument("--scene", type=float, default=None,
+                        help="Extract frames whose scene-change score exceeds this threshold (0-1, e.g. 0.3)")
     args = p.parse_args()
 
     backend = args.backend
     if backend == "auto":
         backend = "ffmpeg" if check_ffmpeg() else "opencv"
 
+    # Ctrl+C stops extraction cleanly; frames written so far are kept.
+    cancel = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: cancel.set())
+
+    def progress(frames: int) -> None:
+        if not args.quiet:
+            print(f"\rFrames: {frames}", end="", file=sys.stderr, flush=True)
+
     print(f"Using backend: {backend}")
     backend_used, count = extract_frames(
         str(args.video),
@@ -44,7 +66,17 @@ def main():
         start_time=args.start,
         duration=args.duration,
         overwrite=args.overwrite,
+        profile=args.profile,
+        sampling=FrameSampling(every=args.every, fps=args.fps, keyframes=args.keyframes, scene=args.scene),
+        workers=args.workers,
+        progress=progress,
+        cancel=cancel,
     )
+    if not args.quiet:
+        print(file=sys.stderr)
+    if cancel.is_set():
+        print(f"Cancelled after {count} frames (backend: {backend_used})")
+        sys.exit(130)
     print(f"Frames written: {count} (backend: {backend_used})")
 
 if __name__ == "__main__":
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+CLI for tools/video_slicer.py: slice video frames without writing frame files.
+
+Works whether run from project root or from tools/ directly.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Ensure project root is on sys.path so `tools` package can be imported.
+this_file = Path(__file__).resolve()
+project_root = this_file.parents[1]  # parent of `tools/`
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from tools.video_slicer import slice_video  # type: ignore
+from tools.video_extractor import FrameSampling  # type: ignore
+from cli.main import parse_size  # type: ignore
+from core.encoding import ENCODER_PROFILES  # type: ignore
+from core.plan import WINDOW_PADDING  # type: ignore
+
+def main():
+    p = argparse.ArgumentParser(description="Slice video frames straight from ffmpeg (Pixi Forge helper).")
+    p.add_argument("video", type=Path, help="Input video file")
+    p.add_argument("outdir", type=Path, help="Output directory for slices")
+    p.add_argument("--mode", required=True, choices=["horizontal", "vertical", "grid", "window"])
+    p.add_argument("--n", type=int, help="Number of slices (horizontal or vertical)")
+    p.add_argument("--rows", type=int, help="Grid rows (grid mode only)")
+    p.add_argument("--cols", type=int, help="Grid columns (grid mode only)")
+    p.add_argument("--tile", type=parse_size, help="Tile size as N or WxH (window mode only)")
+    p.add_argument("--stride", type=parse_size, help="Window step as N or WxH (default: --tile)")
+    p.add_argument("--padding", choices=WINDOW_PADDING, default="shift")
+    p.add_argument("--fmt", default="png", help="Slice image format (png, jpg, webp). Default: png")
+    p.add_argument("--prefix", default="frame", help="Frame name prefix")
+    p.add_argument("--smart", action="store_true", help="Content-aware cuts with deterministic fallback")
+    p.add_argument("--start", type=float, default=None, help="Start time in seconds")
+    p.add_argument("--duration", type=float, default=None, help="Duration in seconds")
+    p.add_argument("--profile", choices=ENCODER_PROFILES, default=None,
+                   help="Encoder profile: fastest, balanced or smallest (default: Pillow defaults)")
+    p.add_argument("--quiet", action="store_true", help="Only log warnings, errors and the summary")
+    sample = p.add_mutually_exclusive_group()
+    sample.add_argument("--every", type=int, default=None, help="Slice every Nth frame")
+    sample.add_argument("--fps", type=float, default=None, help="Slice this many frames per second")
+    sample.add_argument("--keyframes", action="store_true", help="Slice key frames only")
+    sample.add_argument("--scene", type=float, default=None, help="Slice frames past this scene-change score (0-1)")
+    args = p.parse_args()
+
+    result = slice_video(
+        str(args.video),
+        str(args.outdir),
+        mode=args.mode,
+        n=args.n,
+        rows=args.rows,
+        cols=args.cols,
+        tile=args.tile,
+        stride=args.stride,
+        padding=args.padding,
+        output_format=args.fmt,
+        smart=args.smart,
+        prefix=args.prefix,
+        start_time=args.start,
+        duration=args.duration,
+        sampling=FrameSampling(every=args.every, fps=args.fps, keyframes=args.keyframes, scene=args.scene),
+        encoder_profile=args.profile,
+        quiet=args.quiet,
+    )
+    print(f"Frames sliced: {len(result.processed)} (failed: {len(result.failed)})")
+    sys.exit(1 if result.failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -7,13 +7,214 @@ Two backends:
   - ffmpeg (preferred): uses the system ffmpeg binary to extract frames as lossless PNGs.
   - opencv (fallback): uses cv2.VideoCapture and writes PNGs/JPEGs.
 
-Functions return the number of frames written.
+Extraction functions return the number of frames written. iter_frames_ffmpeg
+instead streams decoded frames as NumPy arrays without writing files.
+
+Both backends can sample frames (FrameSampling): every Nth frame, a target
+fps, key frames only or scene changes, seek to a time range, and split a
+run into time segments extracted by parallel processes (workers=).
+
+Extraction functions take progress= (called with the number of frames
+written so far, from ffmpeg's -progress output or the OpenCV write loop)
+and cancel= (a threading.Event; once set, extraction stops and returns the
+frames written so far).
 """
 
+import multiprocessing
 import os
+import re
 import shutil
 import subprocess
-from typing import Optional, Tuple
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from core.encoding import cv2_imwrite_params, ffmpeg_encoder_args
+from core.plan import compute_segments
+
+
+class FrameSampling:
+    """
+    Which frames to extract; at most one option may be set.
+
+    every: every Nth frame, starting with the first.
+    fps: resample to this many frames per second.
+    keyframes: key frames only; non-key frames are not decoded.
+    scene: frames whose scene-change score (0..1) exceeds this threshold,
+           plus the first frame. Every frame is decoded to score it.
+    """
+    def __init__(
+        self,
+        every: Optional[int] = None,
+        fps: Optional[float] = None,
+        keyframes: bool = False,
+        scene: Optional[float] = None
+    ):
+        if sum((every is not None, fps is not None, keyframes, scene is not None)) > 1:
+            raise ValueError("Choose one of every, fps, keyframes or scene.")
+        if every is not None and every <= 0:
+            raise ValueError("every must be a positive integer.")
+        if fps is not None and fps <= 0:
+            raise ValueError("fps must be positive.")
+        if scene is not None and not 0 < scene < 1:
+            raise ValueError("scene threshold must be between 0 and 1.")
+
+        self.every = every
+        self.fps = fps
+        self.keyframes = keyframes
+        self.scene = scene
+
+    def ffmpeg_input_args(self) -> List[str]:
+        """
+        Arguments placed before -i.
+        """
+        # The decoder drops non-key packets before decoding them.
+        return ["-skip_frame", "nokey"] if self.keyframes else []
+
+    @property
+    def warmup(self) -> int:
+        """
+        Frames to decode (and drop) before a segment's first frame so its
+        scene scores match a sequential run.
+        """
+        return 2 if self.scene is not None else 0
+
+    def ffmpeg_output_args(
+        self, first_frame: int = 0, warmup: int = 0, source_fps: Optional[float] = None
+    ) -> List[str]:
+        """
+        Filter arguments placed after the input (output keeps -vsync 0).
+
+        For one segment of a parallel run: first_frame is the index of the
+        segment's first frame counted from the start of the run, decoded
+        after `warmup` dropped frames. With source_fps, fps sampling keeps
+        the first frame of every 1/fps interval by frame index (as the
+        OpenCV backend does) instead of using the fps filter, so segments
+        agree at their boundaries.
+        """
+        offset = first_frame - warmup
+        n = f"(n+{offset})" if offset else "n"  # frame index within the run
+
+        if self.every is not None and self.every > 1:
+            expr = f"not(mod({n}\\,{self.every}))"
+        elif self.fps is not None and source_fps:
+            ratio = f"{self.fps:g}/{source_fps:g}"
+            expr = f"gt(floor({n}*{ratio})\\,floor(({n}-1)*{ratio}))"
+        elif self.fps is not None:
+            return ["-vf", f"fps={self.fps:g}"]
+        elif self.scene is not None:
+            expr = f"eq({n}\\,0)+gt(scene\\,{self.scene:g})"
+        elif warmup:
+            expr = "1"
+        else:
+            return []
+
+        if warmup:
+            expr = f"gte(n\\,{warmup})*({expr})"
+        return ["-vf", f"select={expr}"]
+
+
+def _iter_opencv_frames(
+    cv2,
+    video_path: str,
+    sampling: Optional[FrameSampling],
+    start_frame: int = 0,
+    end_frame: Optional[int] = None,
+    origin: Optional[int] = None
+) -> Iterator[np.ndarray]:
+    """
+    Decoded (BGR) frames [start_frame, end_frame) of a video, sampled.
+    Skipped frames are only grab()bed (demuxed and, for most codecs,
+    decoded without the colour conversion and copy); key-frame mode does
+    not decode them at all. Sampling counts frames from origin (default
+    start_frame), so adjacent ranges sharing an origin agree with one
+    sequential run.
+    """
+    sampling = sampling or FrameSampling()
+    origin = start_frame if origin is None else origin
+
+    if sampling.keyframes:
+        # Raw mode returns packets without decoding; it only finds key frame indices.
+        raw = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_FORMAT, -1])
+        if not raw.isOpened():
+            raise RuntimeError(f"Failed to open video: {video_path}")
+        keys = []
+        index = 0
+        while (end_frame is None or index < end_frame) and raw.grab():
+            if index >= start_frame and raw.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME):
+                keys.append(index)
+            index += 1
+        raw.release()
+
+        cap = cv2.VideoCapture(video_path)
+        try:
+            for index in keys:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, index)  # lands on the key frame itself
+                ok, frame = cap.read()
+                if ok:
+                    yield frame
+        finally:
+            cap.release()
+        return
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Failed to open video: {video_path}")
+
+    source_fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+    last_bucket = -1
+    previous = None
+    previous_mafd = 0.0
+
+    first = start_frame - min(sampling.warmup, start_frame - origin)
+    if first > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, first)
+    if sampling.fps is not None and source_fps > 0 and first > origin:
+        # Mid-run segment: the frame before it may already have taken this interval.
+        last_bucket = int((first - origin - 1) / source_fps * sampling.fps + 1e-6)
+    index = first - 1
+    try:
+        while (end_frame is None or index + 1 < end_frame) and cap.grab():
+            index += 1
+            position = index - origin
+            if sampling.every is not None and position % sampling.every:
+                continue
+            if sampling.fps is not None:
+                seconds = position / source_fps if source_fps > 0 else cap.get(cv2.CAP_PROP_POS_MSEC) / 1000
+                bucket = int(seconds * sampling.fps + 1e-6)
+                if bucket == last_bucket:
+                    continue
+                last_bucket = bucket
+
+            ok, frame = cap.retrieve()
+            if not ok:
+                break
+
+            if sampling.scene is not None:
+                # ffmpeg's select scene score on a thumbnail: the mean absolute
+                # frame difference (mafd), damped by its change since the last
+                # frame so steady motion does not count, scaled by 1/100.
+                thumb = cv2.resize(frame, (64, 64), interpolation=cv2.INTER_AREA)
+                if previous is None:
+                    changed = True
+                else:
+                    mafd = float(cv2.absdiff(thumb, previous).mean())
+                    changed = min(mafd, abs(mafd - previous_mafd)) / 100 > sampling.scene
+                    previous_mafd = mafd
+                previous = thumb
+                if not changed:
+                    continue
+
+            if index < start_frame:
+                continue  # warm-up frame before the range
+
+            yield frame
+    finally:
+        cap.release()
 
 
 def check_ffmpeg() -> bool:
@@ -23,6 +224,108 @@ def check_ffmpeg() -> bool:
     return shutil.which("ffmpeg") is not None
 
 
+def probe_video(video_path: str) -> Tuple[int, int, Optional[float]]:
+    """
+    (width, height, fps) of the first video stream, as ffmpeg will output
+    it (display rotation applied). fps is None if ffmpeg does not report it.
+
+    Parsed from `ffmpeg -i` so no ffprobe binary is needed.
+    """
+    info = _ffmpeg_info(video_path)
+    stream = re.search(r"Stream #.*?Video: .*?, (\d{2,5})x(\d{2,5})[ ,\[]", info)
+    if stream is None:
+        raise RuntimeError(f"No video stream found in: {video_path}")
+    width, height = int(stream.group(1)), int(stream.group(2))
+
+    rotation = re.search(r"rotation of (-?[\d.]+) degrees", info)
+    if rotation is not None and round(abs(float(rotation.group(1)))) % 180 == 90:
+        width, height = height, width
+
+    fps = re.search(r"Video: .*?, ([\d.]+) fps", info)
+    return width, height, float(fps.group(1)) if fps else None
+
+
+def _ffmpeg_info(video_path: str) -> str:
+    """
+    The stream summary `ffmpeg -i` prints for a file.
+    """
+    if not os.path.isfile(video_path):
+        raise FileNotFoundError(f"Video not found: {video_path}")
+    if not check_ffmpeg():
+        raise RuntimeError("ffmpeg not found on PATH. Install ffmpeg or use OpenCV backend.")
+
+    # Without an output file ffmpeg exits non-zero after printing the stream info.
+    proc = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-i", video_path],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, errors="replace"
+    )
+    return proc.stderr
+
+
+def iter_frames_ffmpeg(
+    video_path: str,
+    start_time: Optional[float] = None,
+    duration: Optional[float] = None,
+    sampling: Optional[FrameSampling] = None,
+) -> Iterator[np.ndarray]:
+    """
+    Decode frames with ffmpeg into (height, width, 3) RGB uint8 arrays.
+
+    Frames are piped as rawvideo and read into one reused buffer: each
+    yielded array is only valid until the next frame is requested, so copy
+    it to keep it. Stopping early terminates ffmpeg.
+
+    Raises:
+      RuntimeError if ffmpeg isn't available, fails, or truncates a frame.
+    """
+    width, height, _ = probe_video(video_path)
+    sampling = sampling or FrameSampling()
+
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error"]
+    if start_time is not None:
+        cmd += ["-ss", str(start_time)]
+    cmd += sampling.ffmpeg_input_args()
+    cmd += ["-i", video_path]
+    if duration is not None:
+        cmd += ["-t", str(duration)]
+    cmd += sampling.ffmpeg_output_args()
+    cmd += ["-vsync", "0", "-an", "-f", "rawvideo", "-pix_fmt", "rgb24", "pipe:1"]
+
+    frame_bytes = width * height * 3
+    buffer = bytearray(frame_bytes)
+    view = memoryview(buffer)
+    frame = np.frombuffer(buffer, dtype=np.uint8).reshape(height, width, 3)
+
+    # stderr goes to a file: a pipe nobody reads until stdout ends can fill up and stall ffmpeg.
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
+        finished = False
+        try:
+            while True:
+                got = 0
+                while got < frame_bytes:
+                    n = proc.stdout.readinto(view[got:])
+                    if not n:
+                        break
+                    got += n
+                if got == 0:
+                    break
+                if got < frame_bytes:
+                    raise RuntimeError(f"ffmpeg returned a truncated frame ({got} of {frame_bytes} bytes)")
+                yield frame
+            finished = True
+        finally:
+            if not finished:
+                proc.kill()
+            proc.stdout.close()
+            proc.wait()
+
+        if proc.returncode != 0:
+            stderr.seek(0)
+            errors = stderr.read().decode(errors="replace").strip()
+            raise RuntimeError(f"ffmpeg failed: {errors or f'exit code {proc.returncode}'}")
+
+
 def extract_frames_ffmpeg(
     video_path: str,
     output_dir: str,
@@ -31,6 +334,10 @@ def extract_frames_ffmpeg(
     start_time: Optional[float] = None,
     duration: Optional[float] = None,
     overwrite: bool = False,
+    profile: Optional[str] = None,
+    sampling: Optional[FrameSampling] = None,
+    progress: Optional[Callable[[int], None]] = None,
+    cancel: Optional[threading.Event] = None,
 ) -> int:
     """
     Extract frames using ffmpeg.
@@ -40,8 +347,12 @@ def extract_frames_ffmpeg(
     - start_time: seconds (float) to start extracting from (optional).
     - duration: seconds (float) total duration to extract (optional).
     - overwrite: if True, ffmpeg '-y' (overwrite existing), else '-n' (no overwrite).
+    - profile: encoder profile "fastest", "balanced" or "smallest" (see
+      core.encoding); None keeps ffmpeg's encoder defaults.
+    - sampling: extract only some frames (FrameSampling); None extracts all.
+    - progress / cancel: see the module docstring.
 
-    Returns number of files written.
+    Returns number of files written (by this run, as reported by ffmpeg).
 
     Raises:
       RuntimeError if ffmpeg isn't available or command fails.
@@ -57,13 +368,17 @@ def extract_frames_ffmpeg(
     # output pattern: frame_000001.png
     out_pattern = os.path.join(output_dir, f"{prefix}_%06d.{fmt}")
 
+    sampling = sampling or FrameSampling()
+
     cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error"]
     if start_time is not None:
         # seek before input for fast seek (accurate enough for most)
         cmd += ["-ss", str(start_time)]
+    cmd += sampling.ffmpeg_input_args()
     cmd += ["-i", video_path]
     if duration is not None:
         cmd += ["-t", str(duration)]
+    cmd += sampling.ffmpeg_output_args()
 
     # ensure one output per input frame (no frame duplication)
     cmd += ["-vsync", "0"]
@@ -72,19 +387,58 @@ def extract_frames_ffmpeg(
     cmd += ["-y"] if overwrite else ["-n"]
 
     # For PNG output ffmpeg will automatically use lossless PNG encoding.
+    cmd += ffmpeg_encoder_args(fmt, profile)
     cmd += [out_pattern]
 
-    try:
-        subprocess.run(cmd, check=True)
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"ffmpeg failed: {e}") from e
-
-    # Count how many files were created with the prefix and extension
-    files = sorted(
-        f for f in os.listdir(output_dir)
-        if f.startswith(prefix + "_") and f.lower().endswith("." + fmt.lower())
-    )
-    return len(files)
+    return _run_ffmpeg(cmd, progress, cancel)
+
+
+def _run_ffmpeg(
+    cmd: List[str],
+    progress: Optional[Callable[[int], None]] = None,
+    cancel: Optional[threading.Event] = None
+) -> int:
+    """
+    Run an ffmpeg frame extraction command, following its -progress
+    report. Returns the number of frames it wrote, also when cancelled.
+    """
+    # -progress prints key=value blocks (frame=, ..., progress=continue|end) about twice a second.
+    cmd = cmd[:1] + ["-nostats", "-progress", "pipe:1"] + cmd[1:]
+    frames = 0
+    quitting = False
+    with tempfile.TemporaryFile() as errors:
+        proc = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=errors, text=True
+        )
+        try:
+            for line in proc.stdout:
+                if not quitting and cancel is not None and cancel.is_set():
+                    # 'q' makes ffmpeg finish the current frame and report its final count.
+                    quitting = True
+                    try:
+                        proc.stdin.write("q")
+                        proc.stdin.close()
+                    except OSError:
+                        pass  # already exiting
+                key, _, value = line.strip().partition("=")
+                if key == "frame":
+                    frames = int(value)
+                elif key == "progress" and progress is not None:
+                    progress(frames)
+        except BaseException:
+            proc.kill()
+            raise
+        finally:
+            proc.wait()
+            proc.stdout.close()
+
+        if quitting:
+            return frames
+        if proc.returncode != 0:
+            errors.seek(0)
+            message = errors.read().decode(errors="replace").strip()
+            raise RuntimeError(f"ffmpeg failed (exit {proc.returncode}): {message}")
+    return frames
 
 
 def extract_frames_opencv(
@@ -92,10 +446,25 @@ def extract_frames_opencv(
     output_dir: str,
     fmt: str = "png",
     prefix: str = "frame",
+    profile: Optional[str] = None,
+    sampling: Optional[FrameSampling] = None,
+    start_time: Optional[float] = None,
+    duration: Optional[float] = None,
+    progress: Optional[Callable[[int], None]] = None,
+    cancel: Optional[threading.Event] = None,
+    writers: int = 0,
 ) -> int:
     """
     Extract frames using OpenCV (cv2).
-    Saves frames as PNG/JPEG with maximum quality (PNG compression=0, JPEG quality=100).
+    Saves frames as PNG/JPEG with maximum quality (PNG compression=0, JPEG quality=100)
+    unless an encoder profile ("fastest", "balanced", "smallest") is given.
+    With sampling, skipped frames are grabbed but not retrieved; output
+    files are numbered consecutively, as with ffmpeg.
+    start_time / duration (seconds) are converted to frame positions with
+    the stream's frame rate; the capture seeks straight to the first one.
+    progress / cancel: see the module docstring.
+    writers: threads encoding and writing frames while the next ones are
+    decoded (0 = up to 4, one per CPU).
 
     Returns number of frames written.
 
@@ -111,39 +480,85 @@ def extract_frames_opencv(
 
     os.makedirs(output_dir, exist_ok=True)
 
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        raise RuntimeError(f"Failed to open video: {video_path}")
+    start_frame, end_frame = 0, None
+    if start_time is not None or duration is not None:
+        fps, _ = _video_frames(video_path, "opencv")
+        start_frame = round((start_time or 0) * fps)
+        if duration is not None:
+            end_frame = start_frame + round(duration * fps)
 
-    idx = 0
-    written = 0
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        idx += 1
-        out_name = f"{prefix}_{idx:06d}.{fmt}"
-        out_path = os.path.join(output_dir, out_name)
-
-        # choose codec params for lossless-ish output
-        if fmt.lower() in ("jpg", "jpeg"):
-            # highest-quality jpeg
-            ok = cv2.imwrite(out_path, frame, [int(cv2.IMWRITE_JPEG_QUALITY), 100])
-        elif fmt.lower() == "png":
-            # PNG with no compression
-            ok = cv2.imwrite(out_path, frame, [int(cv2.IMWRITE_PNG_COMPRESSION), 0])
-        else:
-            ok = cv2.imwrite(out_path, frame)
+    frames = _iter_opencv_frames(cv2, video_path, sampling, start_frame, end_frame)
+    return _write_opencv_frames(
+        cv2, frames, output_dir, fmt, prefix, _opencv_write_params(cv2, fmt, profile), progress, cancel, writers
+    )
 
-        if not ok:
-            # break on write failure
-            cap.release()
+
+def _opencv_write_params(cv2, fmt: str, profile: Optional[str]) -> List[int]:
+    if profile is not None:
+        return cv2_imwrite_params(fmt, profile)
+    if fmt.lower() in ("jpg", "jpeg"):
+        # highest-quality jpeg
+        return [int(cv2.IMWRITE_JPEG_QUALITY), 100]
+    if fmt.lower() == "png":
+        # PNG with no compression
+        return [int(cv2.IMWRITE_PNG_COMPRESSION), 0]
+    return []
+
+
+def _write_opencv_frames(cv2, frames: Iterator[np.ndarray], output_dir: str, fmt: str, prefix: str,
+                         write_params: List[int], progress: Optional[Callable[[int], None]] = None,
+                         cancel: Optional[threading.Event] = None, writers: int = 0) -> int:
+    """
+    Write frames as prefix_000001.fmt, ... on a pool of writer threads
+    (0 = up to 4, one per CPU). cv2.imwrite releases the GIL, so encoding
+    overlaps decoding the next frames; at most 2 * writers decoded frames
+    wait in memory. Writes are collected in frame order, so progress counts
+    finished frames in order; a failed write is raised as soon as it is
+    seen finished, which stops decoding.
+    """
+    writers = writers or min(4, os.cpu_count() or 1)
+
+    def write(out_path: str, frame: np.ndarray):
+        if not cv2.imwrite(out_path, frame, write_params):
             raise RuntimeError(f"Failed to write frame {out_path}")
 
+    pending: Deque[Future] = deque()
+    queued = written = 0
+
+    def collect_oldest():
+        nonlocal written
+        pending.popleft().result()
         written += 1
+        if progress is not None:
+            progress(written)
+
+    def check_failed():
+        # A write may fail while older frames are still encoding; raise it
+        # now instead of when its turn to be collected comes up.
+        for future in pending:
+            if future.done() and future.exception() is not None:
+                raise future.exception()
+
+    with ThreadPoolExecutor(max_workers=writers, thread_name_prefix="pixiforge-frame-writer") as pool:
+        try:
+            for frame in frames:
+                if cancel is not None and cancel.is_set():
+                    break
+
+                queued += 1
+                out_path = os.path.join(output_dir, f"{prefix}_{queued:06d}.{fmt}")
+                pending.append(pool.submit(write, out_path, frame))
+                check_failed()
+                while pending and (pending[0].done() or len(pending) >= 2 * writers):
+                    collect_oldest()
+
+            while pending:
+                collect_oldest()
+        finally:
+            frames.close()  # releases the capture
+            for future in pending:
+                future.cancel()
 
-    cap.release()
     return written
 
 
@@ -156,10 +571,19 @@ def extract_frames(
     start_time: Optional[float] = None,
     duration: Optional[float] = None,
     overwrite: bool = False,
+    profile: Optional[str] = None,
+    sampling: Optional[FrameSampling] = None,
+    workers: int = 1,
+    progress: Optional[Callable[[int], None]] = None,
+    cancel: Optional[threading.Event] = None,
 ) -> Tuple[str, int]:
     """
     Convenience wrapper that selects the backend.
 
+    workers > 1 splits the range into that many time segments, extracted
+    by separate processes (see extract_frames_parallel). progress / cancel:
+    see the module docstring.
+
     Returns (backend_used, frames_written).
     """
     backend = backend.lower()
@@ -168,11 +592,207 @@ def extract_frames(
             # try fallback
             backend = "opencv"
 
+    if backend in ("ffmpeg", "opencv") and workers > 1:
+        count = extract_frames_parallel(
+            video_path, output_dir, fmt, prefix, backend, start_time, duration, overwrite, profile, sampling,
+            workers, progress, cancel
+        )
+        return backend, count
+
     if backend == "ffmpeg":
-        count = extract_frames_ffmpeg(video_path, output_dir, fmt, prefix, start_time, duration, overwrite)
+        count = extract_frames_ffmpeg(
+            video_path, output_dir, fmt, prefix, start_time, duration, overwrite, profile, sampling,
+            progress, cancel
+        )
         return "ffmpeg", count
     elif backend == "opencv":
-        count = extract_frames_opencv(video_path, output_dir, fmt, prefix)
+        count = extract_frames_opencv(
+            video_path, output_dir, fmt, prefix, profile, sampling, start_time, duration, progress, cancel
+        )
         return "opencv", count
     else:
         raise ValueError("Unknown backend. Choose 'ffmpeg' or 'opencv'.")
+
+
+def _video_frames(video_path: str, backend: str) -> Tuple[float, int]:
+    """
+    (fps, frame count) of a video as seen by the backend. ffmpeg's count
+    is estimated from the container duration.
+    """
+    if backend == "opencv":
+        import cv2
+
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise RuntimeError(f"Failed to open video: {video_path}")
+        fps, count = cap.get(cv2.CAP_PROP_FPS), int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+    else:
+        _, _, fps = probe_video(video_path)
+        length = re.search(r"Duration: (\d+):(\d+):([\d.]+)", _ffmpeg_info(video_path))
+        if length is None or not fps:
+            raise RuntimeError(f"Cannot split video: duration or frame rate unknown: {video_path}")
+        hours, minutes, seconds = length.groups()
+        count = round((int(hours) * 3600 + int(minutes) * 60 + float(seconds)) * fps)
+
+    if not fps or fps <= 0:
+        raise RuntimeError(f"Cannot seek: frame rate unknown: {video_path}")
+    return fps, count
+
+
+def _extract_segment(job) -> Tuple[int, bool]:
+    """
+    Process-pool entry point: extract frames [start, end) of a video into
+    segment_dir, numbered from 1. end None runs to the end of the video.
+
+    Returns (frames written, whether the segment ran to its end rather
+    than being cancelled).
+    """
+    count = _extract_segment_frames(*job)
+    cancel = job[-1]
+    return count, cancel is None or not cancel.is_set()
+
+
+def _extract_segment_frames(backend, video_path, segment_dir, fmt, prefix, profile, sampling, origin, start, end,
+                            fps, cancel) -> int:
+    os.makedirs(segment_dir, exist_ok=True)
+
+    if backend == "opencv":
+        import cv2
+
+        frames = _iter_opencv_frames(cv2, video_path, sampling, start, end, origin)
+        return _write_opencv_frames(
+            cv2, frames, segment_dir, fmt, prefix, _opencv_write_params(cv2, fmt, profile), cancel=cancel, writers=1
+        )
+
+    warmup = min(sampling.warmup, start - origin)
+    first = start - warmup
+    # Half a frame early, so the (accurate) seek keeps frame `first` itself.
+    seek = (first - 0.5) / fps if first > 0 else 0.0
+    filters = sampling.ffmpeg_output_args(start - origin, warmup, fps)
+    if end is not None:
+        # -t alone may drop the last frame; cut on timestamps halfway between
+        # frames and let -t only stop decoding a frame later.
+        limit = f"select=lt(t\\,{(end - 0.5) / fps - seek:.6f})"
+        filters = ["-vf", f"{filters[1]},{limit}" if filters else limit]
+
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error"]
+    if first > 0:
+        cmd += ["-ss", f"{seek:.6f}"]
+    cmd += sampling.ffmpeg_input_args()
+    cmd += ["-i", video_path]
+    if end is not None:
+        cmd += ["-t", f"{(end + 1) / fps - seek:.6f}"]
+    cmd += filters
+    cmd += ["-vsync", "0", "-y"]
+    cmd += ffmpeg_encoder_args(fmt, profile)
+    cmd += [os.path.join(segment_dir, f"{prefix}_%06d.{fmt}")]
+    return _run_ffmpeg(cmd, cancel=cancel)
+
+
+def extract_frames_parallel(
+    video_path: str,
+    output_dir: str,
+    fmt: str = "png",
+    prefix: str = "frame",
+    backend: str = "ffmpeg",
+    start_time: Optional[float] = None,
+    duration: Optional[float] = None,
+    overwrite: bool = False,
+    profile: Optional[str] = None,
+    sampling: Optional[FrameSampling] = None,
+    workers: int = 0,
+    progress: Optional[Callable[[int], None]] = None,
+    cancel: Optional[threading.Event] = None,
+) -> int:
+    """
+    Split the frame range into `workers` segments (0 = one per CPU) and
+    extract them in parallel processes, with either backend.
+
+    Segments are cut at frame positions and sampling counts frames from
+    the start of the range, so the output matches a sequential run: each
+    segment writes into its own temporary directory and the files are
+    renamed into one consecutive prefix_000001... sequence at the end.
+    Existing files with the same names are replaced only if overwrite is
+    True; otherwise FileExistsError is raised before anything is renamed.
+
+    progress is called as segments finish. Once cancel is set, running
+    segments stop and queued ones are dropped; the frames of the finished
+    segments, up to and including the first stopped one, are kept so the
+    result is the same prefix a cancelled sequential run leaves.
+
+    Returns number of frames written.
+    """
+    if backend not in ("ffmpeg", "opencv"):
+        raise ValueError("Unknown backend. Choose 'ffmpeg' or 'opencv'.")
+    if backend == "ffmpeg" and not check_ffmpeg():
+        raise RuntimeError("ffmpeg not found on PATH. Install ffmpeg or use OpenCV backend.")
+    if not os.path.isfile(video_path):
+        raise FileNotFoundError(f"Video not found: {video_path}")
+
+    sampling = sampling or FrameSampling()
+    fps, total = _video_frames(video_path, backend)
+    first = round((start_time or 0) * fps)
+    last = total if duration is None else min(total, first + round(duration * fps))
+    if last <= first:
+        return 0
+
+    workers = min(workers or os.cpu_count() or 1, last - first)
+    bounds = [first]
+    for length in compute_segments(last - first, workers):
+        bounds.append(bounds[-1] + length)
+    if duration is None:
+        bounds[-1] = None  # frame counts can be estimates; read to the real end
+
+    os.makedirs(output_dir, exist_ok=True)
+    segment_dirs = [os.path.join(output_dir, f".{prefix}_segment{i:03d}") for i in range(workers)]
+    # A manager event is the one the worker processes can see.
+    manager = multiprocessing.Manager() if cancel is not None else None
+    shared_cancel = manager.Event() if manager is not None else None
+    jobs = [
+        (backend, video_path, segment_dir, fmt, prefix, profile, sampling, first, start, end, fps, shared_cancel)
+        for segment_dir, start, end in zip(segment_dirs, bounds[:-1], bounds[1:])
+    ]
+
+    def segment_result(future: Future) -> Tuple[int, bool]:
+        return (0, False) if future.cancelled() else future.result()
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_extract_segment, job) for job in jobs]
+            pending, done_frames = set(futures), 0
+            while pending:
+                done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                if cancel is not None and cancel.is_set() and not shared_cancel.is_set():
+                    # Running segments stop and return their counts; queued ones never start.
+                    shared_cancel.set()
+                    for future in pending:
+                        future.cancel()
+                done_frames += sum(segment_result(future)[0] for future in done)
+                if done and progress is not None:
+                    progress(done_frames)
+
+        counts = []
+        for future in futures:
+            count, finished = segment_result(future)
+            counts.append(count)
+            if not finished:
+                break  # frames of later segments would leave a gap in the sequence
+
+        targets = [os.path.join(output_dir, f"{prefix}_{i:06d}.{fmt}") for i in range(1, sum(counts) + 1)]
+        if not overwrite:
+            existing = next((path for path in targets if os.path.exists(path)), None)
+            if existing is not None:
+                raise FileExistsError(f"Frame already exists (use overwrite=True): {existing}")
+
+        written = 0
+        for segment_dir, count in zip(segment_dirs, counts):
+            for i in range(1, count + 1):
+                written += 1
+                os.replace(os.path.join(segment_dir, f"{prefix}_{i:06d}.{fmt}"), targets[written - 1])
+        return written
+    finally:
+        if manager is not None:
+            manager.shutdown()
+        for segment_dir in segment_dirs:
+            shutil.rmtree(segment_dir, ignore_errors=True)
@@ -0,0 +1,119 @@
+"""
+tools/video_slicer.py
+
+Slice video frames directly, without writing intermediate frame files.
+
+extract_frames + BatchImageProcessor writes every full frame to disk and
+decodes it again. slice_video pipes ffmpeg rawvideo frames into memory
+and runs each one through the batch slicing path (smart cuts, fallback,
+tile filters, encoder profiles, shard sinks), so only the slices are
+written. The output tree matches what slicing an extracted frame folder
+gives: <output_dir>/<prefix>_000001/<prefix>_000001_part1.png, ...
+"""
+
+import os
+import time
+from typing import Optional
+
+from PIL import Image
+
+from batch.logger import SUMMARY, flush_logs, setup_logger
+from batch.metrics import FileTiming, StageTimer
+from batch.processor import BatchResult, SliceParams, process_file
+from batch.sinks import ShardConfig, open_sink
+from core.decoded import DecodedImage
+from core.plan import Size
+from tools.video_extractor import FrameSampling, iter_frames_ffmpeg
+
+
+def slice_video(
+    video_path: str,
+    output_dir: str,
+    mode: str,
+    n: Optional[int] = None,
+    rows: Optional[int] = None,
+    cols: Optional[int] = None,
+    output_format: str = "png",
+    smart: bool = False,
+    prefix: str = "frame",
+    start_time: Optional[float] = None,
+    duration: Optional[float] = None,
+    sampling: Optional[FrameSampling] = None,
+    smart_strategy: str = "greedy",
+    smart_energy: str = "canny",
+    encoder_profile: Optional[str] = None,
+    skip_blank: bool = False,
+    dedupe: bool = False,
+    tile: Optional[Size] = None,
+    stride: Optional[Size] = None,
+    padding: str = "shift",
+    shards: Optional[ShardConfig] = None,
+    log_dir: Optional[str] = None,
+    quiet: bool = False,
+) -> BatchResult:
+    """
+    Slice every frame of a video (ffmpeg backend).
+
+    Slicing options are those of BatchImageProcessor.process. Frames are
+    named <prefix>_000001, ... as extract_frames would name their files;
+    the result lists them as processed or failed, with per-frame timings.
+    sampling picks which frames are sliced (see FrameSampling).
+
+    Raises:
+      RuntimeError if ffmpeg isn't available or fails.
+    """
+    if mode == "window" and smart:
+        raise ValueError("smart slicing does not apply to window mode.")
+
+    params = SliceParams(
+        mode, n, rows, cols, output_format, smart,
+        smart_strategy=smart_strategy,
+        smart_energy=smart_energy,
+        encoder_profile=encoder_profile,
+        skip_blank=skip_blank,
+        dedupe=dedupe,
+        tile=tile,
+        stride=stride,
+        padding=padding
+    )
+    logger = setup_logger(log_dir, quiet=quiet)
+    logger.info(
+        "Video slicing started | %s | mode=%s | smart=%s", os.path.basename(video_path), mode, smart, extra=SUMMARY
+    )
+
+    os.makedirs(output_dir, exist_ok=True)
+    sink = open_sink(output_dir, shards) if shards is not None else None
+    result = BatchResult()
+    try:
+        for number, frame in enumerate(iter_frames_ffmpeg(video_path, start_time, duration, sampling), start=1):
+            name = f"{prefix}_{number:06d}"
+            timer = StageTimer()
+            start = time.perf_counter()
+            with timer.stage("decode"):
+                # The frame buffer is reused by the reader; this is the one copy.
+                image = Image.fromarray(frame)
+
+            # No file behind the frame: the name only names the tiles, and
+            # frames stay out of the energy cache.
+            error = process_file(
+                name, os.path.join(output_dir, name), params, logger, timer, sink,
+                decoded=DecodedImage.from_image(None, image)
+            )
+            result.timings.append(FileTiming(name, error is None, time.perf_counter() - start, timer.stages))
+            if error is None:
+                result.processed.append(name)
+            else:
+                result.failed.append(error)
+            if sink is not None:
+                # Nothing to record (no manifest); this drops the sink's per-frame bookkeeping.
+                sink.commit(name, lambda outputs: None)
+    finally:
+        if sink is not None:
+            sink.close()
+
+    logger.info(
+        "Video slicing completed | frames=%d | failed=%d",
+        len(result.processed) + len(result.failed), len(result.failed), extra=SUMMARY
+    )
+    flush_logs()
+    return result